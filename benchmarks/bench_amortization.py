@@ -0,0 +1,94 @@
+"""
+Benchmarks the array amortization engine against the original row-by-row
+`np.vstack` path for the largest balance the debt form accepts.
+
+Run from the repository root with `python -m benchmarks.bench_amortization`.
+"""
+
+import timeit
+import numpy as np
+import pandas as pd
+import source.base as b
+from source import engine as e
+from source.utils import constants as c
+from benchmarks.bench_calendar import legacy_payment_date_list
+
+RATE = 5.0
+TERM_YEARS = 30
+
+
+def legacy_schedule_array(amort):
+    """The row-by-row schedule builder as it was before the array engine."""
+    schedule_array = np.array([])
+    for number, amount, interest, principal, balance in amort.schedule_by_amount():
+        new_row = np.array([number, amount, interest, principal, balance])
+        if len(schedule_array) > 0:
+            schedule_array = np.vstack([schedule_array, new_row])
+        else:
+            schedule_array = new_row
+    return schedule_array
+
+
+def legacy_generate_amortization(amort):
+    """`Amortization.generate_amortization` as it was before the engine."""
+    schedule_dataframe = pd.DataFrame(
+        legacy_schedule_array(amort), columns=[
+            'Payment Date', 'Payment Amount', 'Interest',
+            'Principal', 'Balance Remaining'])
+    schedule_dataframe['Payment Date'] = legacy_payment_date_list(
+        amort.debt.next_payment_date, amort.debt.payment_frequency,
+        amort.period)
+    pretty_schedule_dataframe = schedule_dataframe.__deepcopy__()
+    for col in ['Payment Amount', 'Interest', 'Principal', 'Balance Remaining']:
+        pretty_schedule_dataframe[col] = pretty_schedule_dataframe[col].map('${:,.2f}'.format)
+    return schedule_dataframe
+
+
+def term_payment(balance, frequency):
+    """The payment that retires `balance` in TERM_YEARS, rounded up."""
+    periods_per_year = c.PAYMENTS_PER_YEAR[frequency]
+    rate = RATE / 100 / periods_per_year
+    periods = TERM_YEARS * periods_per_year
+    payment = balance * rate / (1 - (1 + rate) ** -periods)
+    return float(np.ceil(payment * 100) / 100)
+
+
+def make_amortization(frequency):
+    balance = float(c.MAX_DEBT_BALANCE)
+    return b.Amortization(
+        'Benchmark', 'personal', balance, RATE, 'simple', frequency,
+        '2025-01-31', term_payment(balance, frequency))
+
+
+def best_ms(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1e3
+
+
+def main(repeat=5):
+    print("Schedule stage only (vstack loop vs. engine arrays) and the full "
+          "generate_amortization call, best of", repeat, "runs in ms")
+    print(f"{'frequency':<12} {'periods':>8} {'vstack':>8} {'arrays':>8} "
+          f"{'speedup':>8} {'old full':>9} {'new full':>9} {'speedup':>8}")
+    for frequency in c.PAYMENT_FREQUENCY_OPTIONS:
+        amort = make_amortization(frequency)
+        engine_frame = amort.generate_amortization()
+        legacy_frame = legacy_generate_amortization(make_amortization(frequency))
+        pd.testing.assert_frame_equal(engine_frame, legacy_frame)
+
+        args = (amort.debt.balance, amort.period_rate(),
+                amort.debt.payment_amount)
+        vstack = best_ms(lambda: legacy_schedule_array(amort), repeat)
+        arrays = best_ms(lambda: e.amortization_arrays(*args), repeat)
+        old_full = best_ms(
+            lambda: legacy_generate_amortization(make_amortization(frequency)),
+            repeat)
+        new_full = best_ms(
+            lambda: make_amortization(frequency).generate_amortization(),
+            repeat)
+        print(f"{frequency:<12} {len(engine_frame):>8} {vstack:>8.2f} "
+              f"{arrays:>8.2f} {vstack / arrays:>7.1f}x {old_full:>9.2f} "
+              f"{new_full:>9.2f} {old_full / new_full:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
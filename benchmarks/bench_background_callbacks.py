@@ -0,0 +1,116 @@
+"""
+Compares serving `update_visualizations` within the request against running
+it as a background callback, for a 40 debt portfolio with Table View open.
+For each it reports how long the callback's first request is held open,
+how long until the browser has the outputs, polling the way the renderer
+does, and the same again for a repeat with identical inputs, which runs
+the callback again rather than reusing the first result.
+
+Each mode runs in a fresh interpreter, as background callbacks are enabled
+at startup. Run from the repository root with
+`python -m benchmarks.bench_background_callbacks`; background callbacks
+need the `dash[diskcache]` extra.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from source.app import app
+from source.callbacks import visualization_callbacks as v
+from source.config import BACKGROUND_CALLBACK_CONFIG
+from benchmarks.bench_graph_updates import make_entry
+from benchmarks.bench_visualization_requests import (
+    CHANGE, MARKER, visualizations_output)
+
+PORTFOLIO_SIZE = 40
+
+
+def request_body(output, entries):
+    change = {'operation': 'add', 'debt_index': len(entries) - 1,
+              'position': len(entries) - 1}
+    return {
+        'output': output,
+        'outputs': [{'id': 'payoff_graph', 'property': 'figure'},
+                    {'id': 'amortization_schedule', 'property': 'children'}],
+        'inputs': [{'id': CHANGE, 'property': 'data', 'value': change},
+                   {'id': MARKER, 'property': 'data', 'value': 1}],
+        'state': [{'id': 'amortizations-store', 'property': 'data',
+                   'value': entries},
+                  {'id': 'payoff-graph-traces-store', 'property': 'data',
+                   'value': {
+                       'uids': [str(entry['debt_index'])
+                                for entry in entries[:-1]],
+                       'type': v.payoff_trace_type(entries[:-1])}}],
+        'changedPropIds': [f'{CHANGE}.data', f'{MARKER}.data']}
+
+
+def run_callback(client, body):
+    """
+    Sends the callback and, for a background callback, polls for its
+    result, returning (seconds the first request took, seconds until the
+    outputs arrived, progress updates seen, response).
+    """
+    start = time.perf_counter()
+    response = client.post('/_dash-update-component', json=body)
+    held = time.perf_counter() - start
+    result = response.get_json()
+    progress = []
+    if 'cacheKey' in result:
+        query = f"?cacheKey={result['cacheKey']}&job={result['job']}"
+        interval = BACKGROUND_CALLBACK_CONFIG['interval_ms'] / 1000
+        while True:
+            time.sleep(interval)
+            response = client.post(
+                '/_dash-update-component' + query, json=body)
+            result = response.get_json() if response.status_code == 200 else {}
+            if 'progress' in result:
+                progress.append(list(result['progress'].values())[0])
+            if 'response' in result or response.status_code == 204:
+                break
+    return held, time.perf_counter() - start, progress, result
+
+
+def measure():
+    """Runs in the child interpreter and prints its timings as JSON."""
+    client = app.server.test_client()
+    output = visualizations_output(client)
+    body = request_body(
+        output, [make_entry(debt_index) for debt_index in range(PORTFOLIO_SIZE)])
+    first = run_callback(client, body)
+    repeat = run_callback(client, body)
+    assert 'response' in first[3] and 'response' in repeat[3]
+    assert first[3]['response'] == repeat[3]['response']
+    print(json.dumps({
+        'held': [first[0], repeat[0]], 'total': [first[1], repeat[1]],
+        'progress': first[2]}))
+
+
+def main():
+    print(f"update_visualizations for {PORTFOLIO_SIZE} debts with Table View "
+          "open, in ms")
+    print(f"{'mode':<12} {'request held':>13} {'outputs':>9} "
+          f"{'repeat held':>12} {'repeat outputs':>15}  progress")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for mode, enabled in (('in request', '0'), ('background', '1')):
+            env = {**os.environ, 'BACKGROUND_CALLBACKS': enabled,
+                   'BACKGROUND_CALLBACK_CACHE_DIR': cache_dir,
+                   'INSTRUMENTATION_LOG_EVERY': '0'}
+            result = subprocess.run(
+                [sys.executable, '-c',
+                 'from benchmarks.bench_background_callbacks import measure; '
+                 'measure()'],
+                env=env, capture_output=True, text=True, check=True)
+            timings = json.loads(result.stdout.splitlines()[-1])
+            held, total = (
+                [1000 * seconds for seconds in timings[key]]
+                for key in ('held', 'total'))
+            print(f"{mode:<12} {held[0]:>13.1f} {total[0]:>9.1f} "
+                  f"{held[1]:>12.1f} {total[1]:>15.1f}  "
+                  f"{timings['progress'] or '-'}")
+
+
+if __name__ == '__main__':
+    main()
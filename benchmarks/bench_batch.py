@@ -0,0 +1,70 @@
+"""
+Benchmarks `engine.batch_amortization` against building one
+`base.Amortization` per debt, the way the debt callbacks do today.
+
+Run from the repository root with `python -m benchmarks.bench_batch`.
+"""
+
+import time
+import numpy as np
+import source.base as b
+from source import engine as e
+from source.utils import constants as c
+
+PORTFOLIO_SIZES = [1, 10, 100, 1000, 5000]
+MAX_PER_OBJECT_SIZE = 100
+
+
+def make_portfolio(size, seed=0):
+    """A random portfolio of debts that each pay off within 30 years."""
+    rng = np.random.default_rng(seed)
+    balances = np.round(rng.uniform(500, c.MAX_DEBT_BALANCE, size), 2)
+    rates = np.round(rng.uniform(1, 30, size), 3)
+    frequencies = rng.choice(c.PAYMENT_FREQUENCY_OPTIONS, size)
+    payments_per_year = np.array(
+        [c.PAYMENTS_PER_YEAR[frequency] for frequency in frequencies])
+    period_rates = 0.01 * rates / payments_per_year
+    periods = rng.integers(12, 31, size) * payments_per_year
+    payments = np.ceil(
+        100 * balances * period_rates / (1 - (1 + period_rates) ** -periods)
+    ) / 100
+    return (balances.tolist(), rates.tolist(), payments.tolist(),
+            frequencies.tolist())
+
+
+def per_object(balances, rates, payments, frequencies):
+    return [
+        b.Amortization(
+            'Benchmark', 'personal', balance, rate, 'simple', frequency,
+            '2025-01-31', payment).generate_amortization()
+        for balance, rate, payment, frequency
+        in zip(balances, rates, payments, frequencies)]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    print(f"{'debts':>6} {'rows':>9} {'object ms':>10} {'per debt':>9} "
+          f"{'batch ms':>9} {'per debt':>9}")
+    for size in PORTFOLIO_SIZES:
+        portfolio = make_portfolio(size)
+        batch, batch_seconds = timed(e.batch_amortization, *portfolio)
+        object_columns = ''
+        if size <= MAX_PER_OBJECT_SIZE:
+            frames, object_seconds = timed(per_object, *portfolio)
+            for debt, frame in enumerate(frames):
+                assert np.array_equal(
+                    batch.schedule(debt)[3], frame['Balance Remaining'])
+            object_columns = (f"{object_seconds * 1e3:>10.1f} "
+                              f"{object_seconds / size * 1e3:>9.3f}")
+        print(f"{size:>6} {int(batch.periods.sum()):>9} "
+              f"{object_columns:>20} {batch_seconds * 1e3:>9.1f} "
+              f"{batch_seconds / size * 1e3:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
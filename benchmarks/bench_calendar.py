@@ -0,0 +1,94 @@
+"""
+Benchmarks the vectorized payment calendar against the original
+`relativedelta` loop in `Amortization.get_payment_date_list`, after checking
+that both produce the same dates for every first payment day over several
+years.
+
+Run from the repository root with `python -m benchmarks.bench_calendar`.
+"""
+
+import timeit
+from datetime import datetime, timedelta
+from dateutil.relativedelta import relativedelta
+from source import payment_calendar as pc
+from source.utils import constants as c
+
+SCHEDULE_LENGTHS = [360, 1560, 5200]
+
+
+def legacy_payment_date_list(next_payment_date, payment_frequency, period):
+    """`Amortization.get_payment_date_list` as it was before the calendar."""
+    first_payment_date = datetime.strptime(next_payment_date, '%Y-%m-%d')
+    current_payment_date = first_payment_date
+    date_list = [current_payment_date]
+    if payment_frequency == 'Weekly':
+        one_week = relativedelta(weeks=1)
+        for _ in range(period - 1):
+            current_payment_date += one_week
+            date_list.append(current_payment_date)
+    elif payment_frequency == 'Fortnightly':
+        one_fortnight = relativedelta(weeks=2)
+        for _ in range(period - 1):
+            current_payment_date += one_fortnight
+            date_list.append(current_payment_date)
+    elif payment_frequency == 'Monthly':
+        one_month = relativedelta(months=1)
+        if first_payment_date.day < 29:
+            for _ in range(period - 1):
+                current_payment_date += one_month
+                date_list.append(current_payment_date)
+        else:
+            days_in_each_month = {
+                1: 31, 2: 28, 3: 31, 4: 30, 5: 31, 6: 30, 7: 31, 8: 31,
+                9: 30, 10: 31, 11: 30, 12: 31}
+            for _ in range(period - 1):
+                next_payment_date = current_payment_date + one_month
+                if next_payment_date.month is not None:  # Check for None
+                    next_month_total_days = days_in_each_month[next_payment_date.month]
+                    if next_month_total_days >= first_payment_date.day:
+                        current_payment_date = datetime(
+                            year=next_payment_date.year,
+                            month=next_payment_date.month,
+                            day=first_payment_date.day)
+                    else:
+                        current_payment_date = next_payment_date
+                    date_list.append(current_payment_date)
+    return [dates.strftime('%Y-%m-%d') for dates in date_list]
+
+
+def check_against_legacy(periods=120):
+    """Compares both calendars for every first payment day in 2024-2028."""
+    first_payment_date = datetime(2024, 1, 1)
+    mismatches = 0
+    while first_payment_date.year < 2029:
+        start = first_payment_date.strftime('%Y-%m-%d')
+        for frequency in c.PAYMENT_FREQUENCY_OPTIONS:
+            expected = legacy_payment_date_list(start, frequency, periods)
+            actual = pc.format_dates(
+                pc.payment_dates(start, frequency, periods))
+            mismatches += expected != actual
+        first_payment_date += timedelta(days=1)
+    return mismatches
+
+
+def main(repeat=5):
+    print("Schedules that differ from the legacy calendar:",
+          check_against_legacy())
+    print(f"{'frequency':<12} {'periods':>8} {'loop ms':>8} "
+          f"{'vector ms':>10} {'speedup':>8}")
+    for frequency in c.PAYMENT_FREQUENCY_OPTIONS:
+        for periods in SCHEDULE_LENGTHS:
+            loop = min(timeit.repeat(
+                lambda: legacy_payment_date_list(
+                    '2025-01-31', frequency, periods),
+                number=1, repeat=repeat))
+            vector = min(timeit.repeat(
+                lambda: pc.format_dates(
+                    pc.payment_dates('2025-01-31', frequency, periods)),
+                number=1, repeat=repeat))
+            print(f"{frequency:<12} {periods:>8} {loop * 1e3:>8.2f} "
+                  f"{vector * 1e3:>10.3f} {loop / vector:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
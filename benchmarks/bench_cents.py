@@ -0,0 +1,70 @@
+"""
+Differential check of the integer-cents engine against the float engine.
+
+Amortizes a random portfolio both ways and reports how often and by how
+much the schedules diverge under each cents rounding rule, plus the time
+each engine takes.
+
+Run from the repository root with `python -m benchmarks.bench_cents`.
+"""
+
+import time
+import numpy as np
+import source.base as b
+from source import engine as e
+from source.utils import constants as c
+from benchmarks.bench_batch import make_portfolio
+
+PORTFOLIO_SIZE = 2000
+
+
+def main():
+    portfolio = list(zip(*make_portfolio(PORTFOLIO_SIZE, seed=7)))
+    float_seconds = 0.0
+    float_schedules = []
+    for balance, rate, payment, frequency in portfolio:
+        amort = b.Amortization('Check', 'personal', balance, rate, 'simple',
+                               frequency, '2025-01-31', payment)
+        start = time.perf_counter()
+        schedule = e.amortization_arrays(
+            balance, amort.period_rate(), payment)
+        float_seconds += time.perf_counter() - start
+        float_schedules.append(
+            [np.rint(column * 100).astype(np.int64) for column in schedule])
+
+    rows = sum(len(schedule[0]) for schedule in float_schedules)
+    print(f"{PORTFOLIO_SIZE} debts, {rows} rows; float engine "
+          f"{float_seconds * 1e3:.1f} ms")
+    print(f"{'rounding':<10} {'ms':>8} {'differ':>7} {'rows':>7} "
+          f"{'periods':>8} {'max bal':>8} {'max int':>8}")
+    for rounding in e.ROUNDING_MODES:
+        seconds = 0.0
+        differing_debts = differing_rows = period_changes = 0
+        max_balance_cents = max_interest_cents = 0
+        for (balance, rate, payment, frequency), expected in zip(
+                portfolio, float_schedules):
+            start = time.perf_counter()
+            actual = e.amortization_cents(
+                balance, rate, c.PAYMENTS_PER_YEAR[frequency], payment,
+                rounding)
+            seconds += time.perf_counter() - start
+            if len(actual[0]) != len(expected[0]):
+                period_changes += 1
+            rows = min(len(actual[0]), len(expected[0]))
+            balance_gap = np.abs(actual[3][:rows] - expected[3][:rows])
+            if balance_gap.any() or len(actual[0]) != len(expected[0]):
+                differing_debts += 1
+            differing_rows += int((balance_gap > 0).sum())
+            max_balance_cents = max(max_balance_cents, int(balance_gap.max()))
+            max_interest_cents = max(max_interest_cents, abs(
+                int(actual[1].sum()) - int(expected[1].sum())))
+        print(f"{rounding:<10} {seconds * 1e3:>8.1f} {differing_debts:>7} "
+              f"{differing_rows:>7} {period_changes:>8} "
+              f"{max_balance_cents:>8} {max_interest_cents:>8}")
+    print("differ: schedules with any difference; rows: rows whose balance "
+          "differs; periods: schedules of a different length; max bal / "
+          "max int: largest balance and total-interest gaps in cents")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Measures payoff graph trace downsampling for the largest balance the debt
+form accepts: points and bytes sent per trace with and without it, and the
+largest vertical distance between the full and downsampled curves on a
+plot area of PLOT_HEIGHT_PX pixels, scaled to the trace's own range.
+
+Run from the repository root with `python -m benchmarks.bench_decimation`.
+"""
+
+import numpy as np
+from dash._utils import to_json
+from source.callbacks import visualization_callbacks as v
+from source.config import PAYOFF_GRAPH_MAX_POINTS
+from source.utils import constants as c
+from source.utils import store_codec
+from benchmarks.bench_amortization import best_ms, make_amortization
+from benchmarks.bench_store_payload import columnar_entry
+
+PLOT_HEIGHT_PX = 1000
+
+
+def full_trace(amort_data, schedule):
+    """The trace as it was before downsampling."""
+    return {
+        'line': {'color': amort_data['color']},
+        'name': amort_data['name'],
+        'x': schedule['dates'],
+        'y': schedule['balance'] / c.FORMATTING_DIVISOR,
+        'type': 'scatter'
+    }
+
+
+def max_error_px(schedule, trace):
+    """The largest vertical gap between the full and downsampled curves."""
+    days = np.asarray(schedule['dates'], dtype='datetime64[D]').astype(float)
+    kept_days = np.asarray(trace['x'], dtype='datetime64[D]').astype(float)
+    full = schedule['balance'] / c.FORMATTING_DIVISOR
+    drawn = np.interp(days, kept_days, np.asarray(trace['y']))
+    return np.abs(full - drawn).max() / full.max() * PLOT_HEIGHT_PX
+
+
+def main(repeat=5):
+    print("Payoff graph trace, all points vs. downsampled to",
+          PAYOFF_GRAPH_MAX_POINTS, "points, best of", repeat, "runs")
+    print(f"{'frequency':<12} {'points':>7} {'kept':>5} {'type':>10} "
+          f"{'full KB':>8} {'kept KB':>8} {'error px':>9} {'full ms':>8} "
+          f"{'kept ms':>8}")
+    for frequency in c.PAYMENT_FREQUENCY_OPTIONS:
+        amort = make_amortization(frequency)
+        amort.generate_amortization()
+        entry = columnar_entry(amort, 'base64')
+        schedule = store_codec.decode_schedule(entry['schedule'])
+
+        full = full_trace(entry, schedule)
+        trace_type = v.payoff_trace_type([entry])
+        kept = v.create_payoff_trace(entry, schedule, trace_type)
+        full_ms = best_ms(lambda: to_json(full_trace(entry, schedule)), repeat)
+        kept_ms = best_ms(
+            lambda: to_json(v.create_payoff_trace(entry, schedule, trace_type)),
+            repeat)
+        print(f"{frequency:<12} {len(full['x']):>7} {len(kept['x']):>5} "
+              f"{kept['type']:>10} {len(to_json(full)) / 1024:>8.1f} "
+              f"{len(to_json(kept)) / 1024:>8.1f} "
+              f"{max_error_px(schedule, kept):>9.3f} {full_ms:>8.2f} "
+              f"{kept_ms:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Compares building the payoff figure with plotly `graph_objects`, which
+validates every trace and merges in the template on each call, against
+assembling plain dicts around the cached `payoff_layout()`. Both are
+serialized the way Dash sends them and checked to be identical.
+
+Run from the repository root with `python -m benchmarks.bench_figure_builder`.
+"""
+
+import json
+import plotly.graph_objects as go
+from dash._utils import to_json
+from source.callbacks import visualization_callbacks as v
+from benchmarks.bench_amortization import best_ms
+from benchmarks.bench_graph_updates import make_entry
+
+PORTFOLIO_SIZES = (0, 1, 10, 40)
+
+
+def graph_objects_figure(amortizations_data):
+    """`create_payoff_figure` as it was before the cached layout."""
+    schedules = v.DecodedSchedules(amortizations_data)
+    fig = go.Figure(layout=go.Layout(template='plotly_dark'))
+    trace_type = v.payoff_trace_type(amortizations_data)
+    for position, amort_data in enumerate(amortizations_data):
+        trace = v.create_payoff_trace(
+            amort_data, schedules[position], trace_type)
+        trace_class = (
+            go.Scattergl if trace['type'] == 'scattergl' else go.Scatter)
+        fig.add_trace(trace_class(
+            x=trace['x'], y=trace['y'], line=trace['line'], name=trace['name'],
+            uid=trace['uid']))
+    fig.update_layout(
+        yaxis=dict(
+            tickprefix='$',
+            tickformat='.1f',
+            ticksuffix='K',
+            nticks=5,
+            fixedrange=True
+        ),
+        xaxis=dict(
+            fixedrange=True
+        ),
+        showlegend=False,
+        margin=dict(l=20, r=10, t=10, b=20)
+    )
+    return fig
+
+
+def main(repeat=20):
+    print("Payoff figure build and serialization, graph_objects vs. cached "
+          "layout dicts, best of", repeat, "runs in ms")
+    print(f"{'debts':>6} {'objects':>8} {'dicts':>8} {'speedup':>8}")
+    for size in PORTFOLIO_SIZES:
+        entries = [make_entry(debt_index) for debt_index in range(size)]
+        assert (json.loads(to_json(graph_objects_figure(entries)))
+                == json.loads(to_json(v.create_payoff_figure(entries))))
+        objects = best_ms(
+            lambda: to_json(graph_objects_figure(entries)), repeat)
+        dicts = best_ms(
+            lambda: to_json(v.create_payoff_figure(entries)), repeat)
+        print(f"{size:>6} {objects:>8.2f} {dicts:>8.2f} "
+              f"{objects / dicts:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Compares rebuilding the whole payoff graph against sending only the changed
+trace as a `Patch`, for adding, editing and deleting one debt in portfolios
+of growing size. Response size is the figure serialized the way Dash sends
+it to the browser, and time covers building and serializing it.
+
+Run from the repository root with `python -m benchmarks.bench_graph_updates`.
+"""
+
+import json
+from dash._utils import to_json
+from source.callbacks import visualization_callbacks as v
+from source.utils import constants as c
+from source.utils import store_codec
+from benchmarks.bench_amortization import best_ms, term_payment
+import source.base as b
+
+PORTFOLIO_SIZES = (1, 10, 40, 100)
+
+
+def make_entry(debt_index):
+    """A monthly 30 year amortizations-store entry."""
+    balance = 10_000.0 + 1_000.0 * debt_index
+    amort = b.Amortization(
+        f'Debt {debt_index}', 'personal', balance, 5.0, 'simple', 'Monthly',
+        '2025-01-31', term_payment(balance, 'Monthly'))
+    return {
+        'name': amort.debt.name,
+        'debt_index': debt_index,
+        'color': c.color_order[debt_index % len(c.color_order)],
+        'schedule': store_codec.encode_schedule(
+            amort.generate_amortization(), 'Monthly')
+    }
+
+
+def apply_patch(figure, patch):
+    """Applies the trace operations of a serialized `Patch` to a figure."""
+    data = figure['data']
+    for operation in patch['operations']:
+        if operation['operation'] == 'Append':
+            data.append(operation['params']['value'])
+        elif operation['operation'] == 'Assign':
+            data[operation['location'][1]] = operation['params']['value']
+        else:
+            del data[operation['location'][1]]
+    return figure
+
+
+def operations(entries):
+    """The store before and after each operation, with its change record."""
+    size = len(entries)
+    edited = dict(make_entry(size // 2), color='#FFFFFF')
+    return {
+        'add': (entries, entries + [make_entry(size)],
+                {'operation': 'add', 'debt_index': size, 'position': size}),
+        'edit': (entries,
+                 entries[:size // 2] + [edited] + entries[size // 2 + 1:],
+                 {'operation': 'edit', 'debt_index': size // 2,
+                  'position': size // 2}),
+        'delete': (entries, entries[:size // 2] + entries[size // 2 + 1:],
+                   {'operation': 'delete', 'debt_index': size // 2,
+                    'position': size // 2})
+    }
+
+
+def main(repeat=5):
+    print("Payoff graph response per operation, full rebuild vs. patch, "
+          "best of", repeat, "runs")
+    print(f"{'debts':>6} {'operation':<10} {'full KB':>9} {'patch KB':>9} "
+          f"{'ratio':>7} {'full ms':>8} {'patch ms':>9} {'speedup':>8}")
+    for size in PORTFOLIO_SIZES:
+        entries = [make_entry(debt_index) for debt_index in range(size)]
+        for name, (before, after, change) in operations(entries).items():
+            full = to_json(v.create_payoff_figure(after))
+            patch = to_json(v.patch_payoff_figure(change, after))
+            patched = apply_patch(
+                json.loads(to_json(v.create_payoff_figure(before))),
+                json.loads(patch))
+            assert patched['data'] == json.loads(full)['data']
+
+            full_ms = best_ms(
+                lambda: to_json(v.create_payoff_figure(after)), repeat)
+            patch_ms = best_ms(
+                lambda: to_json(v.patch_payoff_figure(change, after)), repeat)
+            print(f"{size:>6} {name:<10} {len(full) / 1024:>9.1f} "
+                  f"{len(patch) / 1024:>9.1f} {len(full) / len(patch):>6.0f}x "
+                  f"{full_ms:>8.2f} {patch_ms:>9.2f} "
+                  f"{full_ms / patch_ms:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Measures how long schedule generation holds up a worker's quick callbacks.
+Background threads generate long weekly schedules back to back, either in
+their own thread or through the offload pool, while the main thread wakes
+every few milliseconds to run a quick callback-sized task. Reports how
+long after waking the quick task finished, and how many schedules were
+generated.
+
+Run from the repository root with `python -m benchmarks.bench_offload`.
+"""
+
+import statistics
+import threading
+import time
+import source.base as b
+from source import offload
+from source.utils import helpers as h
+
+BUSY_THREADS = 4
+DURATION_SECONDS = 5
+INTERVAL_SECONDS = 0.005
+
+
+def long_amortization():
+    """A weekly schedule of about 4,500 payments."""
+    return b.Amortization(
+        'Long', 'personal', 100_000.0, 6.0, 'simple', 'Weekly', '2025-01-31',
+        116.0)
+
+
+def quick_task():
+    """About as much Python as `toggle_disclaimer_drawer` and its request."""
+    return [h.lighten_hex_color('#2E91E5', amount / 10) for amount in range(10)]
+
+
+def generate(pool, deadline, counts):
+    amort = long_amortization()
+    while time.monotonic() < deadline:
+        if pool is None:
+            amort.generate_amortization()
+        else:
+            pool.run(amort.generate_amortization)
+        counts.append(1)
+
+
+def measure(pool, busy_threads=BUSY_THREADS, duration=DURATION_SECONDS):
+    """Times the quick task while `busy_threads` generate schedules."""
+    counts, latencies = [], []
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=generate, args=(pool, deadline, counts))
+        for _ in range(busy_threads)]
+    for thread in threads:
+        thread.start()
+    while time.monotonic() < deadline:
+        # Includes waiting for the GIL after waking up, as a request thread
+        # does when its request arrives
+        start = time.perf_counter()
+        time.sleep(INTERVAL_SECONDS)
+        quick_task()
+        latencies.append(time.perf_counter() - start - INTERVAL_SECONDS)
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    return {
+        'p50_ms': 1000 * statistics.median(latencies),
+        'p99_ms': 1000 * latencies[int(0.99 * (len(latencies) - 1))],
+        'max_ms': 1000 * latencies[-1],
+        'schedules_per_second': len(counts) / duration
+    }
+
+
+def main():
+    pool = offload.ComputePool(
+        max_workers=offload.OFFLOAD_CONFIG['max_workers'] or 1,
+        max_pending=BUSY_THREADS, timeout_seconds=60)
+    # Start the pool's processes before timing anything
+    pool.run(int)
+    print(f"Quick task latency in ms with {BUSY_THREADS} threads generating "
+          f"{len(long_amortization().generate_amortization())} payment "
+          f"schedules for {DURATION_SECONDS} s, {pool.max_workers} pool "
+          "processes")
+    print(f"{'schedules':<12} {'p50':>7} {'p99':>7} {'max':>7} "
+          f"{'schedules/s':>12}")
+    for name, mode in (('none', None), ('inline', None), ('offloaded', pool)):
+        result = measure(mode, busy_threads=0 if name == 'none' else
+                         BUSY_THREADS)
+        print(f"{name:<12} {result['p50_ms']:>7.2f} {result['p99_ms']:>7.2f} "
+              f"{result['max_ms']:>7.2f} "
+              f"{result['schedules_per_second']:>12.1f}")
+    pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
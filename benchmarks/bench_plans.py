@@ -0,0 +1,44 @@
+"""
+Times each payoff plan on a 50-debt portfolio of 30-year debts at every
+payment frequency.
+
+Run from the repository root with `python -m benchmarks.bench_plans`.
+"""
+
+import timeit
+import source.base as b
+from source import plans as p
+from source.utils import constants as c
+from benchmarks.bench_batch import make_portfolio
+
+PORTFOLIO_SIZE = 50
+
+
+def make_debts(frequency):
+    balances, rates, payments, frequencies = make_portfolio(PORTFOLIO_SIZE)
+    return [
+        b.Debt(f'Debt {i}', 'personal', balance, rate, 'simple', frequency,
+               '2025-01-31', round(
+                   payment * c.PAYMENTS_PER_YEAR[original_frequency]
+                   / c.PAYMENTS_PER_YEAR[frequency], 2))
+        for i, (balance, rate, payment, original_frequency)
+        in enumerate(zip(balances, rates, payments, frequencies))]
+
+
+def main(repeat=5):
+    print(f"{'frequency':<12} {'plan':<10} {'periods':>8} {'ms':>8} "
+          f"{'interest':>16} {'payoff':>11}")
+    for frequency in c.PAYMENT_FREQUENCY_OPTIONS:
+        debts = make_debts(frequency)
+        for plan_type in p.PLAN_TYPES:
+            result = p.simulate_plan(debts, plan_type)
+            seconds = min(timeit.repeat(
+                lambda: p.simulate_plan(debts, plan_type),
+                number=1, repeat=repeat))
+            print(f"{frequency:<12} {plan_type:<10} {len(result.dates):>8} "
+                  f"{seconds * 1e3:>8.1f} {result.total_interest:>16,.2f} "
+                  f"{result.payoff_date:>11}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Compares what the fused visualization callback uploads when the debts'
+schedules live in amortizations-store against a reference to them in the
+server-side session store, as the portfolio grows, along with the time to
+save and load a portfolio in the session store.
+
+Run from the repository root with `python -m benchmarks.bench_session_store`.
+"""
+
+import os
+import tempfile
+from source import session_store as ss
+from source.app import app
+from benchmarks.bench_amortization import best_ms
+from benchmarks.bench_graph_updates import make_entry
+from benchmarks.bench_visualization_requests import (
+    CHANGE, MARKER, post, visualizations_output)
+
+PORTFOLIO_SIZES = (1, 10, 40, 100)
+
+
+def main(repeat=5):
+    client = app.server.test_client()
+    output = visualizations_output(client)
+    print("Upload and download KB per add with Table View open, schedules "
+          "in the browser vs. in the session store, best of", repeat,
+          "runs for session store saves and loads in ms")
+    print(f"{'debts':>6} {'browser KB':>15} {'session KB':>15} "
+          f"{'save ms':>8} {'load ms':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        ss.session_store = ss.SQLiteSessionStore(
+            os.path.join(directory, 'sessions.sqlite3'),
+            max_session_bytes=64 * 1024 * 1024, ttl_seconds=3600,
+            pool_size=4)
+        try:
+            for size in PORTFOLIO_SIZES:
+                entries = [make_entry(index) for index in range(size)]
+                change = {'operation': 'add', 'debt_index': size - 1,
+                          'position': size - 1}
+                reference = ss.save_amortizations(entries, None)
+                assert ss.load_amortizations(reference) == entries
+
+                browser = post(client, output, entries, change, 1,
+                               (CHANGE, MARKER))
+                session = post(client, output, reference, change, 1,
+                               (CHANGE, MARKER))
+                save_ms = best_ms(
+                    lambda: ss.save_amortizations(entries, reference), repeat)
+                load_ms = best_ms(
+                    lambda: ss.load_amortizations(reference), repeat)
+                print(f"{size:>6} {browser[0] / 1024:>7.1f} / "
+                      f"{browser[1] / 1024:>5.1f} {session[0] / 1024:>7.1f} / "
+                      f"{session[1] / 1024:>5.1f} {save_ms:>8.2f} "
+                      f"{load_ms:>8.2f}")
+        finally:
+            ss.session_store = None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Measures how long a new worker takes to start and to serve its first user.
+Each run is a fresh interpreter, as on a cold start, that imports
+`source.app` under `python -X importtime` and then, through the Flask test
+client, loads the page and sends a first payoff graph update. Runs are
+made with the warm-up hook off and on, and the slowest imports of the last
+run without it are listed.
+
+Run from the repository root with `python -m benchmarks.bench_startup`.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from benchmarks.bench_graph_updates import make_entry
+
+RUNS = 5
+TOP_MODULES = 12
+
+# Run in the fresh interpreter; reads the amortizations-store entries from
+# stdin, so building them doesn't import anything in that process first
+CHILD = """
+import json, sys, time
+entries = json.loads(sys.stdin.read())
+start = time.perf_counter()
+from source.app import app
+imported = time.perf_counter()
+client = app.server.test_client()
+client.get('/')
+client.get('/_dash-layout')
+output = next(
+    dependency['output']
+    for dependency in client.get('/_dash-dependencies').get_json()
+    if dependency['output'].startswith('..payoff_graph.figure'))
+loaded = time.perf_counter()
+response = client.post('/_dash-update-component', json={
+    'output': output,
+    'outputs': [{'id': 'payoff_graph', 'property': 'figure'},
+                {'id': 'amortization_schedule', 'property': 'children'}],
+    'inputs': [
+        {'id': 'amortizations-change-store', 'property': 'data',
+         'value': {'operation': 'add', 'debt_index': 0, 'position': 0}},
+        {'id': 'amortization-tables-marker-store', 'property': 'data',
+         'value': None}],
+    'state': [{'id': 'amortizations-store', 'property': 'data',
+               'value': entries},
+              {'id': 'payoff-graph-traces-store', 'property': 'data',
+               'value': None}],
+    'changedPropIds': ['amortizations-change-store.data']})
+assert response.status_code == 200, response.status_code
+updated = time.perf_counter()
+print(json.dumps({'import': imported - start, 'page': loaded - imported,
+                  'update': updated - loaded}))
+"""
+
+
+def run(entries, warm_up):
+    """Starts one interpreter, returning its timings and -X importtime log."""
+    env = {**os.environ, 'WARM_UP': '1' if warm_up else '0'}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD],
+        input=json.dumps(entries), capture_output=True, text=True, env=env,
+        check=True)
+    return json.loads(result.stdout.splitlines()[-1]), result.stderr
+
+
+def slowest_imports(importtime_log, count):
+    """
+    The modules with the longest cumulative import time among those
+    imported directly by `source` modules or by the interpreter.
+    """
+    modules = []
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 2:
+            modules.append((int(cumulative), name.strip()))
+    return sorted(modules, reverse=True)[:count]
+
+
+def main(runs=RUNS):
+    entries = [make_entry(0)]
+    print("Worker startup in ms, median of", runs, "fresh interpreters")
+    print(f"{'warm-up':<8} {'import':>8} {'page load':>10} "
+          f"{'first update':>13} {'total':>8}")
+    for warm_up in (False, True):
+        timings = []
+        for _ in range(runs):
+            timing, importtime_log = run(entries, warm_up)
+            timings.append(timing)
+            if not warm_up:
+                cold_log = importtime_log
+        median = {key: 1000 * statistics.median(t[key] for t in timings)
+                  for key in ('import', 'page', 'update')}
+        print(f"{'on' if warm_up else 'off':<8} {median['import']:>8.0f} "
+              f"{median['page']:>10.0f} {median['update']:>13.0f} "
+              f"{sum(median.values()):>8.0f}")
+
+    print()
+    print("Slowest imports without warm-up, cumulative ms")
+    for microseconds, name in slowest_imports(cold_log, TOP_MODULES):
+        print(f"{microseconds / 1000:>8.1f}  {name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Compares the size of one debt's amortizations-store entry in the original
+per-row format (numbers plus preformatted records) against the columnar
+format in each encoding, serialized the way Dash sends it to the browser.
+
+Run from the repository root with `python -m benchmarks.bench_store_payload`.
+"""
+
+from dash._utils import to_json
+from source.utils import constants as c
+from source.utils import store_codec
+from benchmarks.bench_amortization import make_amortization
+
+
+def legacy_entry(amort):
+    """An amortizations-store entry as it was before the columnar format."""
+    return {
+        'name': 'Benchmark',
+        'debt_index': 0,
+        'color': c.color_order[0],
+        'raw_data': {
+            'dates': list(amort.amortization['Payment Date']),
+            'balances': list(amort.amortization['Balance Remaining'])
+        },
+        'table_data': amort.pretty_amortization.to_dict('records'),
+        'columns': amort.pretty_amortization.columns.tolist()
+    }
+
+
+def columnar_entry(amort, encoding):
+    return {
+        'name': 'Benchmark',
+        'debt_index': 0,
+        'color': c.color_order[0],
+        'schedule': store_codec.encode_schedule(
+            amort.amortization, amort.debt.payment_frequency, encoding)
+    }
+
+
+def main():
+    print(f"{'frequency':<12} {'periods':>8} {'legacy KB':>10} "
+          f"{'json KB':>8} {'ratio':>6} {'base64 KB':>10} {'ratio':>6}")
+    for frequency in c.PAYMENT_FREQUENCY_OPTIONS:
+        amort = make_amortization(frequency)
+        amort.generate_amortization()
+        legacy = len(to_json(legacy_entry(amort)))
+        sizes = []
+        for encoding in store_codec.ENCODINGS:
+            entry = columnar_entry(amort, encoding)
+            decoded = store_codec.decode_schedule(entry['schedule'])
+            assert decoded['dates'] == list(amort.amortization['Payment Date'])
+            assert (decoded['balance']
+                    == amort.amortization['Balance Remaining']).all()
+            sizes.append(len(to_json(entry)))
+        print(f"{frequency:<12} {len(amort.amortization):>8} "
+              f"{legacy / 1024:>10.1f} {sizes[0] / 1024:>8.1f} "
+              f"{legacy / sizes[0]:>5.1f}x {sizes[1] / 1024:>10.1f} "
+              f"{legacy / sizes[1]:>5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Times `Amortization.payoff_summary` against generating the full schedule,
+which was previously the only way to get a debt's payoff numbers, for
+amortizing loans over 15 and 30 year terms. Reports how many summaries
+were proved from the closed form rather than falling back to the exact
+recurrence, and the median bound on their total interest, and checks every
+summary against its schedule.
+
+Run from the repository root with `python -m benchmarks.bench_summary`.
+"""
+
+import time
+import numpy as np
+import source.base as b
+from source.utils import constants as c
+
+TERMS_YEARS = (15, 30)
+LOANS = 200
+
+
+def make_loans(term_years, frequency, count=LOANS, seed=0):
+    """Random loans whose payment, rounded up, retires them in the term."""
+    rng = np.random.default_rng(seed)
+    payments_per_year = c.PAYMENTS_PER_YEAR[frequency]
+    loans = []
+    for _ in range(count):
+        balance = round(float(rng.uniform(5_000, c.MAX_DEBT_BALANCE)), 2)
+        rate = round(float(rng.uniform(2, 12)), 3)
+        period_rate = rate / 100 / payments_per_year
+        periods = term_years * payments_per_year
+        payment = np.ceil(100 * balance * period_rate
+                          / (1 - (1 + period_rate) ** -periods)) / 100
+        loans.append(b.Amortization(
+            'Benchmark', 'personal', balance, rate, 'simple', frequency,
+            '2025-01-31', float(payment)))
+    return loans
+
+
+def mean_ms(func, loans):
+    start = time.perf_counter()
+    for amort in loans:
+        func(amort)
+    return (time.perf_counter() - start) / len(loans) * 1e3
+
+
+def main():
+    print(f"Mean per loan over {LOANS} loans")
+    print(f"{'term':<5} {'frequency':<12} {'confirmed':>10} "
+          f"{'schedule ms':>12} {'summary ms':>11} {'exact ms':>9} "
+          f"{'tolerance':>10}")
+    for term_years in TERMS_YEARS:
+        for frequency in c.PAYMENT_FREQUENCY_OPTIONS:
+            loans = make_loans(term_years, frequency)
+            summaries = [amort.payoff_summary() for amort in loans]
+            for amort, summary in zip(loans, summaries):
+                schedule = amort.generate_amortization()
+                assert summary.periods == len(schedule)
+                assert summary.payoff_date == schedule['Payment Date'].iloc[-1]
+                assert abs(summary.total_interest
+                           - round(schedule['Interest'].sum(), 2)) \
+                    <= summary.interest_tolerance + 1e-6
+            confirmed = [summary for summary in summaries if not summary.exact]
+            tolerance = np.median(
+                [summary.interest_tolerance for summary in confirmed]
+            ) if confirmed else 0.0
+            schedule_ms = mean_ms(
+                lambda amort: amort.generate_amortization(), loans)
+            summary_ms = mean_ms(lambda amort: amort.payoff_summary(), loans)
+            exact_ms = mean_ms(
+                lambda amort: amort.payoff_summary(exact=True), loans)
+            print(f"{term_years:>3}y  {frequency:<12} "
+                  f"{len(confirmed):>6}/{len(loans):<3} {schedule_ms:>12.3f} "
+                  f"{summary_ms:>11.3f} {exact_ms:>9.3f} {tolerance:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Compares the Table View response for one debt when every row is sent as
+`html.Tr`/`html.Td` components against the paginated table, which sends
+only its first page, and the size of each later page request.
+
+Run from the repository root with `python -m benchmarks.bench_table_pages`.
+"""
+
+import dash_mantine_components as dmc
+from dash import html
+from dash._utils import to_json
+from source.callbacks import visualization_callbacks as v
+from source.utils import constants as c
+from source.utils import store_codec
+from benchmarks.bench_amortization import best_ms, make_amortization
+from benchmarks.bench_store_payload import columnar_entry
+
+
+def legacy_table(amort_data):
+    """The row-per-component table as it was before pagination."""
+    schedule = store_codec.decode_schedule(amort_data['schedule'])
+    columns = ['Payment Date', *store_codec.SCHEDULE_COLUMNS.values()]
+    rows = zip(schedule['dates'], *(
+        store_codec.format_currency(schedule[key])
+        for key in store_codec.SCHEDULE_COLUMNS))
+    return dmc.Table(children=[
+        html.Thead(html.Tr([html.Th(col) for col in columns])),
+        html.Tbody([html.Tr([html.Td(cell) for cell in row]) for row in rows])
+    ])
+
+
+def main(repeat=5):
+    print("Table View response for one debt, all rows vs. first page of",
+          c.AMORTIZATION_TABLE_PAGE_SIZE, "rows, best of", repeat, "runs")
+    print(f"{'frequency':<12} {'periods':>8} {'rows KB':>8} {'paged KB':>9} "
+          f"{'page KB':>8} {'rows ms':>8} {'paged ms':>9} {'page ms':>8}")
+    for frequency in c.PAYMENT_FREQUENCY_OPTIONS:
+        amort = make_amortization(frequency)
+        amort.generate_amortization()
+        entry = columnar_entry(amort, 'base64')
+        schedule = entry['schedule']
+        last_page = store_codec.page_count(
+            schedule, c.AMORTIZATION_TABLE_PAGE_SIZE) - 1
+
+        rows = len(to_json(legacy_table(entry)))
+        paged = len(to_json(v.create_amortization_table(entry)))
+        page = len(to_json(store_codec.schedule_page(
+            schedule, last_page, c.AMORTIZATION_TABLE_PAGE_SIZE)))
+        rows_ms = best_ms(lambda: to_json(legacy_table(entry)), repeat)
+        paged_ms = best_ms(
+            lambda: to_json(v.create_amortization_table(entry)), repeat)
+        page_ms = best_ms(lambda: to_json(store_codec.schedule_page(
+            schedule, last_page, c.AMORTIZATION_TABLE_PAGE_SIZE)), repeat)
+        print(f"{frequency:<12} {schedule['periods']:>8} {rows / 1024:>8.1f} "
+              f"{paged / 1024:>9.1f} {page / 1024:>8.1f} {rows_ms:>8.2f} "
+              f"{paged_ms:>9.2f} {page_ms:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
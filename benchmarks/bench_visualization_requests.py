@@ -0,0 +1,98 @@
+"""
+Counts the requests and bytes each user action costs the visualizations,
+with the graph and tables updated by the fused `update_visualizations`
+callback, against updating them from two callbacks on the same store. The
+two-callback case is replayed against the same endpoint as two requests,
+one per trigger, which is what the renderer sends for separate callbacks.
+
+Run from the repository root with
+`python -m benchmarks.bench_visualization_requests`.
+"""
+
+import json
+from source.app import app
+from source.callbacks import visualization_callbacks as v
+from source.utils import constants as c
+from benchmarks.bench_graph_updates import make_entry
+
+PORTFOLIO_SIZES = (1, 10, 40)
+CHANGE = 'amortizations-change-store'
+MARKER = 'amortization-tables-marker-store'
+
+
+def visualizations_output(client):
+    """The output string the renderer uses for `update_visualizations`."""
+    client.get('/')
+    for dependency in client.get('/_dash-dependencies').get_json():
+        if dependency['output'].startswith('..payoff_graph.figure'):
+            return dependency['output']
+    raise LookupError("update_visualizations is not registered")
+
+
+def post(client, output, amortizations_data, traces, change, marker,
+         triggers):
+    """Sends one callback request, returning (request bytes, response bytes)."""
+    body = json.dumps({
+        'output': output,
+        'outputs': [{'id': 'payoff_graph', 'property': 'figure'},
+                    {'id': 'amortization_schedule', 'property': 'children'}],
+        'inputs': [{'id': CHANGE, 'property': 'data', 'value': change},
+                   {'id': MARKER, 'property': 'data', 'value': marker}],
+        'state': [{'id': 'amortizations-store', 'property': 'data',
+                   'value': amortizations_data},
+                  {'id': 'payoff-graph-traces-store', 'property': 'data',
+                   'value': traces}],
+        'changedPropIds': [f'{trigger}.data' for trigger in triggers]})
+    response = client.post('/_dash-update-component', data=body,
+                           content_type='application/json')
+    assert response.status_code in (200, 204), response.status_code
+    return len(body), len(response.data)
+
+
+def user_actions(size):
+    """
+    Each action's store after it, graph traces before it, change record and
+    triggered inputs.
+    """
+    entries = [make_entry(debt_index) for debt_index in range(size)]
+    added = entries + [make_entry(size)]
+    shown = {'uids': [str(debt_index) for debt_index in range(size)],
+             'type': v.payoff_trace_type(entries)}
+    shown_added = {'uids': [str(debt_index) for debt_index in range(size + 1)],
+                   'type': v.payoff_trace_type(added)}
+    add = {'operation': 'add', 'debt_index': size, 'position': size}
+    delete = {'operation': 'delete', 'debt_index': 0, 'position': 0}
+    return {
+        'add, graph open': (added, shown, add, (CHANGE,)),
+        'add, table open': (added, shown, add, (CHANGE, MARKER)),
+        'delete, table open': (
+            added[1:], shown_added, delete, (CHANGE, MARKER)),
+        'open table': (entries, shown, add, (MARKER,))
+    }
+
+
+def main():
+    client = app.server.test_client()
+    output = visualizations_output(client)
+    print("Visualization requests and KB (up / down) per user action, two "
+          "callbacks vs. one fused callback")
+    print(f"{'debts':>6} {'action':<20} {'split reqs':>10} {'split KB':>15} "
+          f"{'fused reqs':>10} {'fused KB':>15} {'saved KB':>9}")
+    for size in PORTFOLIO_SIZES:
+        for action, (entries, shown, change, triggers) in (
+                user_actions(size).items()):
+            split = [post(client, output, entries, shown, change, 1,
+                          (trigger,))
+                     for trigger in triggers]
+            fused = [post(client, output, entries, shown, change, 1,
+                          triggers)]
+            split_up, split_down = (sum(sizes) / 1024 for sizes in zip(*split))
+            fused_up, fused_down = (sum(sizes) / 1024 for sizes in zip(*fused))
+            saved = split_up + split_down - fused_up - fused_down
+            print(f"{size:>6} {action:<20} {len(split):>10} "
+                  f"{split_up:>7.1f} / {split_down:>5.1f} {len(fused):>10} "
+                  f"{fused_up:>7.1f} / {fused_down:>5.1f} {saved:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+A local load test of the production serving mode. Starts gunicorn with
+`source/gunicorn.conf.py`, first with a single worker and then with one per
+CPU, and has concurrent clients send the fused payoff graph and Table View
+update for a 10 debt portfolio, the app's most CPU-bound request, for a
+fixed time. Reports throughput and latency for each worker count; the gain
+grows with the host's CPUs, and there's none on a single CPU.
+
+Run from the repository root with `python -m benchmarks.load_test`.
+"""
+
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from source.callbacks import visualization_callbacks as v
+from benchmarks.bench_graph_updates import make_entry
+from benchmarks.bench_visualization_requests import CHANGE, MARKER
+
+CLIENTS = 16
+DURATION_SECONDS = 10
+PORTFOLIO_SIZE = 10
+STARTUP_TIMEOUT_SECONDS = 60
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, workers):
+    """Starts gunicorn and waits until it serves the app."""
+    env = {**os.environ, 'PORT': str(port), 'WORKERS': str(workers),
+           'INSTRUMENTATION_LOG_EVERY': '0'}
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config',
+         'source/gunicorn.conf.py', '--log-level', 'warning'],
+        env=env)
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            connection.request('GET', '/_dash-dependencies')
+            dependencies = json.loads(connection.getresponse().read())
+            connection.close()
+            return process, next(
+                dependency['output'] for dependency in dependencies
+                if dependency['output'].startswith('..payoff_graph.figure'))
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise TimeoutError("gunicorn didn't start")
+
+
+def request_body(output):
+    entries = [make_entry(debt_index) for debt_index in range(PORTFOLIO_SIZE)]
+    change = {'operation': 'add', 'debt_index': PORTFOLIO_SIZE - 1,
+              'position': PORTFOLIO_SIZE - 1}
+    return json.dumps({
+        'output': output,
+        'outputs': [{'id': 'payoff_graph', 'property': 'figure'},
+                    {'id': 'amortization_schedule', 'property': 'children'}],
+        'inputs': [{'id': CHANGE, 'property': 'data', 'value': change},
+                   {'id': MARKER, 'property': 'data', 'value': 1}],
+        'state': [{'id': 'amortizations-store', 'property': 'data',
+                   'value': entries},
+                  {'id': 'payoff-graph-traces-store', 'property': 'data',
+                   'value': {
+                       'uids': [str(entry['debt_index'])
+                                for entry in entries[:-1]],
+                       'type': v.payoff_trace_type(entries[:-1])}}],
+        'changedPropIds': [f'{CHANGE}.data', f'{MARKER}.data']})
+
+
+def client(port, body, deadline, latencies, errors):
+    """Sends requests back to back over one connection until `deadline`."""
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    headers = {'Content-Type': 'application/json'}
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        connection.request('POST', '/_dash-update-component', body, headers)
+        response = connection.getresponse()
+        response.read()
+        if response.status == 200:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors.append(response.status)
+    connection.close()
+
+
+def load(workers, clients=CLIENTS, duration=DURATION_SECONDS):
+    """Runs the load against gunicorn with `workers` workers."""
+    port = free_port()
+    process, output = start_server(port, workers)
+    try:
+        body = request_body(output)
+        latencies, errors = [], []
+        deadline = time.monotonic() + duration
+        threads = [
+            threading.Thread(
+                target=client, args=(port, body, deadline, latencies, errors))
+            for _ in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        process.terminate()
+        process.wait()
+    latencies.sort()
+    return {
+        'requests_per_second': len(latencies) / duration,
+        'p50_ms': 1000 * statistics.median(latencies),
+        'p95_ms': 1000 * latencies[int(0.95 * (len(latencies) - 1))],
+        'errors': len(errors)
+    }
+
+
+def main():
+    cpus = len(os.sched_getaffinity(0))
+    print(f"{CLIENTS} clients for {DURATION_SECONDS} s each, {cpus} CPUs, "
+          f"{PORTFOLIO_SIZE} debt graph and Table View updates")
+    print(f"{'workers':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'errors':>7} {'speedup':>8}")
+    baseline = None
+    for workers in sorted({1, cpus}):
+        result = load(workers)
+        baseline = baseline or result['requests_per_second']
+        print(f"{workers:>8} {result['requests_per_second']:>8.1f} "
+              f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+              f"{result['errors']:>7} "
+              f"{result['requests_per_second'] / baseline:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
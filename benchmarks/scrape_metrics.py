@@ -0,0 +1,127 @@
+"""
+A stand-in for a Prometheus scraper: drives a few debt additions through
+the app, scrapes /metrics, checks the exposition text is well formed, with
+a worker label on every sample, and prints the samples it found.
+
+Run from the repository root with
+`METRICS_TOKEN=<any token> python -m benchmarks.scrape_metrics`, as the
+endpoint is only served when a token is set.
+"""
+
+import re
+from source.app import app
+from source.config import METRICS_CONFIG
+from source.utils import constants as c
+
+SAMPLE = re.compile(
+    r'^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)'
+    r'(?:\{(?P<labels>(?:[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*",?)*)\})?'
+    r' (?P<value>\S+)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def submit_debt(client, output, amortizations, details, index):
+    """Posts one debt form submission, returning the updated stores."""
+    state = [
+        ('amortizations-store', 'data', amortizations),
+        ('debt-details-store', 'data', details),
+        ('next-debt-index-store', 'data', len(details)),
+        ('name', 'value', f'Debt {index}'),
+        ('balance', 'value', 10_000 + 1_000 * index),
+        ('interest_rate', 'value', 6),
+        ('payment_amount', 'value', 300),
+        ('payment_frequency', 'value', c.PAYMENT_FREQUENCY_OPTIONS[index % 3]),
+        ('next_payment_date', 'value', '2025-01-31'),
+        ('form-state-store', 'data', {'mode': 'add', 'debt_index': None})]
+    outputs = [
+        dict(zip(('id', 'property'), part.split('@')[0].rsplit('.', 1)))
+        for part in output.strip('.').split('...')]
+    response = client.post('/_dash-update-component', json={
+        'output': output,
+        'outputs': outputs,
+        'inputs': [{'id': 'submit_debt_form', 'property': 'n_clicks',
+                    'value': 1}],
+        'state': [{'id': component, 'property': prop, 'value': value}
+                  for component, prop, value in state],
+        'changedPropIds': ['submit_debt_form.n_clicks']})
+    stores = response.get_json()['response']
+    return (stores['amortizations-store']['data'],
+            stores['debt-details-store']['data'])
+
+
+def parse(text):
+    """Parses exposition text into (name, labels, value) samples."""
+    types = {}
+    samples = []
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, metric_type = line.split(' ')
+            types[name] = metric_type
+        elif line and not line.startswith('#'):
+            match = SAMPLE.match(line)
+            assert match, f"Malformed sample: {line}"
+            labels = dict(LABEL.findall(match['labels'] or ''))
+            samples.append((match['name'], labels, float(match['value'])))
+    for name, _, _ in samples:
+        family = re.sub(r'_(bucket|sum|count)$', '', name)
+        assert name in types or family in types, f"Undeclared: {name}"
+    return types, samples
+
+
+def check_histograms(types, samples):
+    """Checks every histogram's buckets are cumulative up to its count."""
+    for family, metric_type in types.items():
+        if metric_type != 'histogram':
+            continue
+        series = {}
+        for name, labels, value in samples:
+            if name.startswith(family + '_'):
+                key = tuple(sorted(
+                    (k, v) for k, v in labels.items() if k != 'le'))
+                series.setdefault(key, {'buckets': []})
+                if name.endswith('_bucket'):
+                    series[key]['buckets'].append(value)
+                else:
+                    series[key][name.rsplit('_', 1)[1]] = value
+        for values in series.values():
+            buckets = values['buckets']
+            assert buckets == sorted(buckets), f"{family} isn't cumulative"
+            assert buckets[-1] == values['count'], f"{family} +Inf != count"
+
+
+def main(debts=6):
+    if not METRICS_CONFIG['enabled']:
+        raise SystemExit("Set METRICS_TOKEN to serve /metrics")
+    client = app.server.test_client()
+    client.get('/')
+    output = next(
+        dependency['output']
+        for dependency in client.get('/_dash-dependencies').get_json()
+        if 'debt_cards_container.children' in dependency['output']
+        and 'submit_debt_form' in str(dependency['inputs']))
+    amortizations, details = [], {}
+    for index in range(debts):
+        amortizations, details = submit_debt(
+            client, output, amortizations, details, index)
+    # The same terms again should hit the amortization cache
+    submit_debt(client, output, amortizations, details, 0)
+
+    assert client.get('/metrics').status_code == 401
+    response = client.get(
+        '/metrics',
+        headers={'Authorization': f"Bearer {METRICS_CONFIG['token']}"})
+    assert response.status_code == 200, response.status_code
+    assert response.content_type.startswith('text/plain')
+    types, samples = parse(response.get_data(as_text=True))
+    check_histograms(types, samples)
+    assert all('worker' in labels for _, labels, _ in samples)
+
+    print(f"Scraped {len(samples)} samples in {len(types)} families")
+    for name, labels, value in samples:
+        if not name.endswith('_bucket'):
+            label_text = ','.join(f'{k}={v}' for k, v in labels.items())
+            print(f"  {name:<40} {label_text:<55} {value:g}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,17 @@
 from dash import Dash, _dash_renderer
-from source.config import EXTERNAL_STYLESHEETS, APP_CONFIG, SECURITY_HEADERS, get_runtime_config
+from source.config import EXTERNAL_STYLESHEETS, APP_CONFIG, SECURITY_HEADERS, INSTRUMENTATION_CONFIG, WARM_UP, get_runtime_config
 from source.layout import create_app_layout
 from source import callbacks as cb
+from source import instrumentation
+from source import logs
+from source import metrics
+from source import warmup
 
-app = Dash(external_stylesheets=EXTERNAL_STYLESHEETS)
+logs.configure_logging()
+
+# Naming the app saves Dash from walking the call stack to find its caller,
+# which takes it hundreds of milliseconds at startup
+app = Dash(__name__, external_stylesheets=EXTERNAL_STYLESHEETS)
 
 # Configure app settings
 app.config.suppress_callback_exceptions = APP_CONFIG['suppress_callback_exceptions']
@@ -14,7 +22,9 @@ _dash_renderer._set_react_version(APP_CONFIG['react_version'])
 # Set the application layout
 app.layout = create_app_layout()
 
-# Register callbacks
+# Register callbacks, timing each one if instrumentation is enabled
+if INSTRUMENTATION_CONFIG['enabled']:
+    instrumentation.instrument_callbacks(app)
 cb.register_callbacks(app)
 
 
@@ -31,6 +41,33 @@ def apply_security_headers(response):
     return add_security_headers(response)
 
 
+if INSTRUMENTATION_CONFIG['enabled']:
+    @app.server.before_request
+    def start_request_timing():
+        """Start timing each request."""
+        instrumentation.start_request()
+
+    @app.server.after_request
+    def apply_server_timing(response):
+        """Add Server-Timing headers and record callback metrics."""
+        return instrumentation.finish_request(response)
+
+    @app.server.teardown_request
+    def finish_request_timing(exception):
+        """Stop counting each request as in flight."""
+        instrumentation.teardown_request(exception)
+
+
+@app.server.route('/metrics')
+def serve_metrics():
+    """Serve worker metrics in the Prometheus text format."""
+    return metrics.metrics_response()
+
+
+if WARM_UP:
+    warmup.warm_up(app)
+
+
 if __name__ == '__main__':
     runtime_config = get_runtime_config()
     app.run(**runtime_config)
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""
+Optional Dash background callbacks for the heavy callbacks.
+
+A background callback answers its request straight away and runs in a
+separate process, which writes its progress and result to a cache on
+local disk that the browser polls. That keeps long runs from holding a
+request, and a gunicorn thread, open the whole time. Starting the callback
+again, or changing one of its `cancel` inputs, stops a run that's still
+going. Everything stays on the one machine, with no broker. Every run
+starts a new job: results aren't reused for identical inputs, as the
+callbacks' outputs depend on which input triggered them and the payoff
+graph's is a patch against the figure the browser already has.
+
+A job is a process forked from the worker, so what it records in memory
+dies with it. Each job sends the worker the operations it timed, such as
+schedule generation, plus its own run time as `background_<callback>`,
+through the same disk cache, and the worker adds them to its metrics when
+they're scraped. Jobs that are cancelled report nothing. Jobs don't use
+the amortization cache, as their copy of it is thrown away with them, and
+a job's phases aren't timed, as it answers no request.
+
+With background callbacks disabled, `callback` registers an ordinary
+callback with the same outputs, so callbacks are written once for both.
+"""
+
+from functools import wraps
+import os
+from dash import DiskcacheManager
+from source.config import BACKGROUND_CALLBACK_CONFIG
+from source.instrumentation import operation_metrics
+
+# Whether this process is a background callback's job
+_in_job = False
+
+
+def create_manager():
+    """Returns the manager that runs jobs and keeps their results on disk."""
+    import diskcache
+    os.makedirs(BACKGROUND_CALLBACK_CONFIG['cache_dir'], exist_ok=True)
+    return DiskcacheManager(
+        diskcache.Cache(BACKGROUND_CALLBACK_CONFIG['cache_dir']),
+        expire=BACKGROUND_CALLBACK_CONFIG['expire_seconds'])
+
+
+def close():
+    """
+    Closes the cache's database connection, for a process that forks
+    workers after using it; each process reopens it when it next needs it.
+    """
+    if manager is not None:
+        manager.handle.close()
+
+
+def in_job():
+    """Whether the calling code runs in a background callback's job."""
+    return _in_job
+
+
+def _job_metrics_prefix(worker_pid):
+    return f'job-metrics-{worker_pid}'
+
+
+def _report_to_worker(func):
+    """
+    Wraps a callback function that runs as a job to send the operations it
+    times to the worker that started it.
+    """
+    @wraps(func)
+    def job(*args, **kwargs):
+        global _in_job
+        _in_job = True
+        worker_pid = os.getppid()
+        # Forget the worker's metrics this process was forked with
+        operation_metrics.clear()
+        try:
+            with operation_metrics.time(f'background_{func.__name__}'):
+                return func(*args, **kwargs)
+        finally:
+            manager.handle.push(
+                operation_metrics.snapshot(),
+                prefix=_job_metrics_prefix(worker_pid),
+                expire=BACKGROUND_CALLBACK_CONFIG['expire_seconds'])
+    return job
+
+
+def collect_job_metrics():
+    """
+    Adds the metrics sent by jobs this worker started since it last
+    collected them to its own.
+    """
+    if manager is None:
+        return
+    prefix = _job_metrics_prefix(os.getpid())
+    while True:
+        key, snapshot = manager.handle.pull(prefix=prefix)
+        if key is None:
+            return
+        operation_metrics.merge(snapshot)
+
+
+def _ignore_progress(progress):
+    pass
+
+
+def callback(app, *dependencies, progress=None, progress_default=None,
+             running=None, cancel=None, **kwargs):
+    """
+    Registers a callback like `app.callback`, as a background callback when
+    they're enabled.
+
+    Parameters
+    ----------
+
+    progress: Output or list of Output
+        Outputs the callback reports its progress to while it runs. When
+        given, the callback function takes a `set_progress` function before
+        its other arguments, which does nothing without background
+        callbacks.
+
+    running: list of (Output, value, value)
+        Properties set to the first value while the callback runs and back
+        to the second once it's done.
+
+    cancel: Input or list of Input
+        Inputs whose changes stop the callback if it's still running.
+    """
+    if manager is None:
+        decorator = app.callback(*dependencies, running=running, **kwargs)
+        if progress is None:
+            return decorator
+
+        def register(func):
+            @wraps(func)
+            def without_progress(*args):
+                return func(_ignore_progress, *args)
+            return decorator(without_progress)
+        return register
+
+    decorator = app.callback(
+        *dependencies, background=True,
+        manager=manager,
+        interval=BACKGROUND_CALLBACK_CONFIG['interval_ms'],
+        progress=progress, progress_default=progress_default,
+        running=running, cancel=cancel,
+        **kwargs)
+    return lambda func: decorator(_report_to_worker(func))
+
+
+# Shared by every callback, or None when callbacks run in the request
+manager = (
+    create_manager() if BACKGROUND_CALLBACK_CONFIG['enabled'] else None)
@@ -1,23 +1,19 @@
-import pandas as pd
-import numpy as np
-from amortization.schedule import amortization_schedule
-from amortization.period import calculate_amortization_period
-from amortization.amount import calculate_amortization_amount
-from amortization.enums import PaymentFrequency
 from typing import Iterator, Tuple
-from datetime import datetime
-from dateutil.relativedelta import relativedelta
+from source import engine as e
+from source import payment_calendar as pc
 
 class Frequencies:
     frequencies = {
-        'Monthly': PaymentFrequency.MONTHLY,
-        'monthly': PaymentFrequency.MONTHLY,
-        'Fortnightly': PaymentFrequency.FORTNIGHTLY,
-        'fortnightly': PaymentFrequency.FORTNIGHTLY,
-        'Weekly': PaymentFrequency.WEEKLY,
-        'weekly': PaymentFrequency.WEEKLY
+        'Monthly': 12,
+        'monthly': 12,
+        'Fortnightly': 26,
+        'fortnightly': 26,
+        'Weekly': 52,
+        'weekly': 52
     }
 
+ARITHMETIC_MODES = ('float', 'cents')
+
 class Debt():
     """
     Base class for storing details about individual debts and producing an 
@@ -90,21 +86,58 @@ class Amortization():
     def __init__(self, name: str, account_type: str,
                  balance: float, interest_rate: float,
                  interest_calculation_method: str, payment_frequency: str,
-                 next_payment_date: str, payment_amount: float):
-        
+                 next_payment_date: str, payment_amount: float,
+                 arithmetic: str = 'float', rounding: str = 'half_even'):
+        """
+        Takes the same parameters as `Debt`, plus:
+
+        arithmetic: {'float', 'cents'}
+            How the schedule is computed. 'float' rounds float dollar amounts 
+            to the cent each period. 'cents' works in whole cents with 
+            integer arithmetic (see `engine.amortization_cents`).
+
+        rounding: {'half_even', 'half_up'}
+            How 'cents' arithmetic rounds interest that falls exactly on a 
+            half cent. Ignored for 'float'.
+        """
+        if arithmetic not in ARITHMETIC_MODES:
+            raise ValueError(f"Unsupported arithmetic: {arithmetic}")
         self.debt = Debt(name, account_type, balance, interest_rate, 
                     interest_calculation_method, payment_frequency,
                     next_payment_date, payment_amount)
+        self.arithmetic = arithmetic
+        self.rounding = rounding
+        self.amortization = None
                     
-    def schedule_by_amount(self) -> Iterator[Tuple[int, float, float, float, float]]:
-        amortization_amount = self.debt.payment_amount
+    def period_rate(self) -> float:
+        """Returns the interest rate charged each payment period."""
         frequency_string = self.debt.payment_frequency
-        adjusted_interest = 0.01 * self.debt.interest_rate / \
-            Frequencies.frequencies[frequency_string].value
+        return 0.01 * self.debt.interest_rate / \
+            Frequencies.frequencies[frequency_string]
+
+    def max_periods(self) -> int:
+        """Returns the most payments this debt's schedule may have."""
+        return e.max_schedule_periods(
+            Frequencies.frequencies[self.debt.payment_frequency])
+
+    def schedule_by_amount(
+            self, max_periods: int = None
+            ) -> Iterator[Tuple[int, float, float, float, float]]:
+        if max_periods is None:
+            max_periods = self.max_periods()
+        amortization_amount = self.debt.payment_amount
+        adjusted_interest = self.period_rate()
         balance = self.debt.balance
+        e.check_schedule(
+            balance, round(balance * adjusted_interest, 2), 
+            amortization_amount, 
+            e.estimate_periods(balance, adjusted_interest, amortization_amount),
+            max_periods)
         number = 0
         self.period = 0
         while balance > 0:
+            if number == max_periods:
+                raise e.ScheduleTooLongError(max_periods)
             number += 1
             self.period += 1
             interest = round(balance * adjusted_interest, 2)
@@ -116,62 +149,61 @@ class Amortization():
                     balance + interest, 0
             yield number, amortization_amount, interest, principal, balance
 
+    def payoff_summary(self, exact: bool = False) -> e.PayoffSummary:
+        """
+        Returns the number of payments, payoff date and total interest 
+        without generating the schedule. See `engine.payoff_summary`.
+        """
+        summary = e.payoff_summary(
+            self.debt.balance, self.period_rate(), self.debt.payment_amount,
+            exact=exact, max_periods=self.max_periods())
+        if summary.periods:
+            summary.payoff_date = pc.format_dates(pc.nth_payment_dates(
+                self.debt.next_payment_date, self.debt.payment_frequency,
+                [summary.periods - 1]))[0]
+        return summary
+
     def get_payment_date_list(self):
-        first_payment_date = datetime.strptime(
-            self.debt.next_payment_date, '%Y-%m-%d')
-        current_payment_date = first_payment_date
-        date_list = [current_payment_date]
-        if self.debt.payment_frequency == 'Weekly':
-            one_week = relativedelta(weeks=1)
-            for _ in range(self.period - 1):
-                current_payment_date += one_week
-                date_list.append(current_payment_date)
-        elif self.debt.payment_frequency == 'Fortnightly':
-            one_fortnight = relativedelta(weeks=2)
-            for _ in range(self.period - 1):
-                current_payment_date += one_fortnight
-                date_list.append(current_payment_date)
-        elif self.debt.payment_frequency == 'Monthly':
-            one_month = relativedelta(months=1)
-            if first_payment_date.day < 29:
-                for _ in range(self.period - 1):
-                    current_payment_date += one_month
-                    date_list.append(current_payment_date)
-            else:
-                days_in_each_month = {
-                    1: 31, 2: 28, 3: 31, 4: 30, 5: 31, 6: 30, 7: 31, 8: 31,
-                    9: 30, 10: 31, 11: 30, 12: 31}
-                for _ in range(self.period - 1):
-                    next_payment_date = current_payment_date + one_month
-                    if next_payment_date.month is not None:  # Check for None
-                        next_month_total_days = days_in_each_month[next_payment_date.month]
-                        if next_month_total_days >= first_payment_date.day:
-                            current_payment_date = datetime(
-                                year=next_payment_date.year,
-                                month=next_payment_date.month,
-                                day=first_payment_date.day)
-                        else:
-                            current_payment_date = next_payment_date
-                        date_list.append(current_payment_date)
-        return [dates.strftime('%Y-%m-%d') for dates in date_list]
+        dates = pc.payment_dates(
+            self.debt.next_payment_date, self.debt.payment_frequency,
+            self.period)
+        return pc.format_dates(dates)
 
     def generate_amortization(self):
-        schedule_object = self.schedule_by_amount()
-        schedule_array = np.array([])
-        for number, amount, interest, principal, balance in schedule_object:
-            new_row = np.array([number, amount, interest, principal, balance])
-            if len(schedule_array) > 0:
-                schedule_array = np.vstack([schedule_array, new_row])
-            else:
-                schedule_array = new_row
-        schedule_dataframe = pd.DataFrame(
-            schedule_array, columns=[
-                'Payment Date', 'Payment Amount', 'Interest', 
-                'Principal', 'Balance Remaining'])
-        schedule_dataframe['Payment Date'] = self.get_payment_date_list()
+        # pandas is imported here rather than at the top of the module, as
+        # it's slow to import and only needed once a schedule is generated
+        import pandas as pd
+        if self.arithmetic == 'cents':
+            columns = e.amortization_cents(
+                self.debt.balance, self.debt.interest_rate,
+                Frequencies.frequencies[self.debt.payment_frequency],
+                self.debt.payment_amount, self.rounding, self.max_periods())
+            columns = [column / 100 for column in columns]
+        else:
+            columns = e.amortization_arrays(
+                self.debt.balance, self.period_rate(), 
+                self.debt.payment_amount, self.max_periods())
+        amounts, interests, principals, balances = columns
+        self.period = len(balances)
+        schedule_dataframe = pd.DataFrame({
+            'Payment Date': self.get_payment_date_list(),
+            'Payment Amount': amounts,
+            'Interest': interests,
+            'Principal': principals,
+            'Balance Remaining': balances})
         self.amortization = schedule_dataframe
-        pretty_schedule_dataframe = schedule_dataframe.__deepcopy__()
+        return self.amortization
+
+    @property
+    def pretty_amortization(self):
+        """
+        The amortization schedule with amounts formatted for display. Built 
+        on first access rather than with the schedule, since most callers 
+        only need the numbers.
+        """
+        if self.amortization is None:
+            return None
+        pretty_schedule_dataframe = self.amortization.__deepcopy__()
         for col in ['Payment Amount', 'Interest', 'Principal', 'Balance Remaining']:
             pretty_schedule_dataframe[col] = pretty_schedule_dataframe[col].map('${:,.2f}'.format)
-        self.pretty_amortization = pretty_schedule_dataframe
-        return self.amortization
\ No newline at end of file
+        return pretty_schedule_dataframe
\ No newline at end of file
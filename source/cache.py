@@ -0,0 +1,126 @@
+"""Thread-safe, bounded LRU caches for computed results."""
+
+from collections import OrderedDict
+import threading
+from source.config import AMORTIZATION_CACHE_CONFIG
+
+
+class LRUCache():
+    """
+    A least-recently-used cache bounded by both entry count and total size.
+
+    All bookkeeping happens under a lock, so one cache can be shared by every
+    thread in a worker. Values are computed outside the lock; two threads
+    missing on the same key at once may both compute it, and the second
+    result simply replaces the first.
+    """
+    def __init__(self, max_entries: int, max_bytes: int, sizeof):
+        """
+        Parameters
+        ----------
+
+        max_entries: int
+            The most values kept at once. 0 disables the cache.
+
+        max_bytes: int
+            The most total bytes, as measured by `sizeof`, kept at once.
+            Values bigger than this are never stored.
+
+        sizeof: callable
+            Returns the approximate size of a value in bytes.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns the cached value for `key`, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Stores a value, evicting the least recently used as needed."""
+        size = self.sizeof(value)
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while (len(self._entries) > self.max_entries
+                   or self.current_bytes > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Returns the cached value for `key`, computing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Drops every entry and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Returns a snapshot of the cache's size and counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0.0
+            }
+
+
+def amortization_key(balance, interest_rate, payment_frequency,
+                     payment_amount, next_payment_date):
+    """
+    Normalizes the inputs that determine an amortization schedule into a
+    cache key, so e.g. '1500' and 1500.0 or 'monthly' and 'Monthly' hit the
+    same entry. The debt's name and type don't affect the schedule and are
+    left out.
+    """
+    return (float(balance), float(interest_rate),
+            str(payment_frequency).capitalize(), float(payment_amount),
+            str(next_payment_date)[:10])
+
+
+def frame_sizeof(frame):
+    """The in-memory size of a DataFrame, including its strings."""
+    return int(frame.memory_usage(deep=True).sum())
+
+
+# Shared by every thread in the worker process. Cached schedules are handed
+# to every caller with the same inputs, so they must be treated as read-only.
+amortization_cache = LRUCache(
+    max_entries=AMORTIZATION_CACHE_CONFIG['max_entries'],
+    max_bytes=AMORTIZATION_CACHE_CONFIG['max_bytes'],
+    sizeof=frame_sizeof)
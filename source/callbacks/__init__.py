@@ -3,6 +3,7 @@
 from source.callbacks import form_callbacks
 from source.callbacks import debt_callbacks
 from source.callbacks import visualization_callbacks
+from source.callbacks import plan_callbacks
 from source.callbacks import ui_callbacks
 
 
@@ -11,4 +12,5 @@ def register_callbacks(app):
     form_callbacks.register_callbacks(app)
     debt_callbacks.register_callbacks(app)
     visualization_callbacks.register_callbacks(app)
+    plan_callbacks.register_callbacks(app)
     ui_callbacks.register_callbacks(app)
\ No newline at end of file
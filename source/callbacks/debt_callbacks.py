@@ -1,27 +1,36 @@
 """Debt CRUD operation callbacks."""
 
-from dash import html, callback_context, no_update
+from dash import callback_context, no_update, Patch
 from dash.dependencies import Input, Output, State, ALL
-from dash_iconify import DashIconify
-import dash_mantine_components as dmc
 from source.utils import helpers as h
 from source.utils import constants as c
-import source.base as b
+from source.utils import store_codec
+from source import background
+from source import engine as e
+from source import offload
+from source import session_store as ss
+from source.config import AMORTIZATION_STORE_ENCODING
+from source.instrumentation import phase
 import json
 
 
 def register_callbacks(app):
     """Register debt CRUD-related callbacks."""
     
-    @app.callback(
+    @background.callback(
+        app,
         # Output('payoff_graph', 'figure'),
         Output('amortizations-store', 'data'),
         Output('debt-details-store', 'data'),
         Output('debt_cards_container', 'children'),
         Output('debt_form_drawer', 'opened', allow_duplicate=True),
+        Output('payment_amount', 'error', allow_duplicate=True),
+        Output('amortizations-change-store', 'data'),
+        Output('next-debt-index-store', 'data'),
         [
             State('amortizations-store', 'data'),
             State('debt-details-store', 'data'),
+            State('next-debt-index-store', 'data'),
             State('name', 'value'),
             State('balance', 'value'),
             State('interest_rate', 'value'),
@@ -32,11 +41,14 @@ def register_callbacks(app):
             State('form-state-store', 'data'),
             Input('submit_debt_form', 'n_clicks')
         ],
+        running=[(Output('submit_debt_form', 'loading'), True, False)],
+        # Closing the form abandons a schedule that's still being generated
+        cancel=[Input('debt_form_drawer', 'opened')],
         prevent_initial_call=True,
     )
     def make_debt_details_and_amortization_cards(
-        amortizations_data, debt_details_data, name, balance, rate, 
-        payment_amount, frequency, next_payment_date, # fig_dict, 
+        amortizations_data, debt_details_data, next_debt_index, name, 
+        balance, rate, payment_amount, frequency, next_payment_date, # fig_dict, 
         form_state, n_clicks):
         """
         Creates the debt graph and table views.
@@ -48,17 +60,24 @@ def register_callbacks(app):
         # Check if this is an actual button click or just initialization
         ctx = callback_context
         if not ctx.triggered or n_clicks == 0 or n_clicks is None:
-            return no_update, no_update, no_update, no_update
+            return (no_update, no_update, no_update, no_update, no_update, 
+                    no_update, no_update)
             
         # Validate that all required form fields have values
         if not all([
             name, balance, rate, payment_amount, frequency, next_payment_date
         ]):
-            return no_update, no_update, no_update, no_update
+            return (no_update, no_update, no_update, no_update, no_update, 
+                    no_update, no_update)
 
-        # Initialize store data if None
-        if amortizations_data is None:
-            amortizations_data = []
+        # Initialize store data if None, fetching the amortizations from the
+        # session store if that's where they're kept
+        stored_amortizations = amortizations_data
+        try:
+            amortizations_data = ss.load_amortizations(amortizations_data)
+        except ss.SessionExpiredError as error:
+            return (no_update, no_update, no_update, no_update, str(error), 
+                    no_update, no_update)
         if debt_details_data is None:
             debt_details_data = {}
 
@@ -67,34 +86,49 @@ def register_callbacks(app):
         debt_index = form_state.get('debt_index')
 
         if mode == 'add':
-            # For add mode, create a new debt index
-            current_debt_index = len(debt_details_data)
+            # For add mode, take the next debt index. The counter only goes 
+            # up, so a deleted debt's index, and anything still keyed by it, 
+            # is never handed to a new debt, and indices increase in card 
+            # order.
+            current_debt_index = max(
+                next_debt_index or 0,
+                max((int(index) for index in debt_details_data), 
+                    default=-1) + 1)
+            next_debt_index = current_debt_index + 1
         else:
             # For edit mode, use the existing debt index
             current_debt_index = debt_index
+            next_debt_index = no_update
 
         debt_color = c.color_order[current_debt_index % len(c.color_order)]
         lighter_debt_color = h.lighten_hex_color(debt_color, amount=0.5)
 
-        amort_object = b.Amortization(
-            name=name, account_type='personal', balance=float(balance), 
-            interest_rate=float(rate), interest_calculation_method='simple', 
-            payment_frequency=frequency, next_payment_date=next_payment_date, 
-            payment_amount=float(payment_amount)
-        )
-        amort_object.generate_amortization()
+        # The engine rejects terms that never pay off or take too long to, 
+        # even if the request skipped the form validation, and the offload 
+        # pool gives up on schedules that take too long to generate
+        try:
+            with phase('amortization'):
+                amort_object = h.get_amortization(
+                    name=name, account_type='personal', 
+                    balance=float(balance), interest_rate=float(rate), 
+                    interest_calculation_method='simple', 
+                    payment_frequency=frequency, 
+                    next_payment_date=next_payment_date, 
+                    payment_amount=float(payment_amount)
+                )
+        except (e.AmortizationError, offload.ComputeTimeoutError) as error:
+            return (no_update, no_update, no_update, no_update, str(error), 
+                    no_update, no_update)
 
-        amortization_data = {
-            'name': name,
-            'debt_index': current_debt_index,
-            'color': debt_color,
-            'raw_data': {
-                'dates': list(amort_object.amortization['Payment Date']), 
-                'balances': list(amort_object.amortization['Balance Remaining'])
-            },
-            'table_data': amort_object.pretty_amortization.to_dict('records'),
-            'columns': amort_object.pretty_amortization.columns.tolist()
-        }
+        with phase('encode'):
+            amortization_data = {
+                'name': name,
+                'debt_index': current_debt_index,
+                'color': debt_color,
+                'schedule': store_codec.encode_schedule(
+                    amort_object.amortization, frequency,
+                    AMORTIZATION_STORE_ENCODING)
+            }
 
         # Add to amortizations store data
         updated_amortizations = amortizations_data.copy()
@@ -108,63 +142,18 @@ def register_callbacks(app):
 
         # Otherwise append it
         if not found:
+            i = len(updated_amortizations)
             updated_amortizations.append(amortization_data)
+
+        # Tell the views which entry changed so they can update just that one
+        amortizations_change = {
+            'operation': 'edit' if found else 'add',
+            'debt_index': current_debt_index,
+            'position': i
+        }
         
-        debt_details_card = html.Div([
-            dmc.Card([
-                dmc.CardSection([
-                    dmc.Grid([
-                        dmc.GridCol(html.H4(
-                            name, 
-                            className='card_title'), span=9),
-                        dmc.GridCol(
-                            dmc.Group([
-                                dmc.ActionIconGroup([
-                                    dmc.ActionIcon(
-                                        DashIconify(
-                                            icon='iconoir:edit', 
-                                            width=20
-                                        ),
-                                        size='lg',
-                                        n_clicks=0,
-                                        color="blue",
-                                        variant='subtle', 
-                                        id={
-                                            'type': 'open_edit_debt_form_button', 
-                                            'index': current_debt_index
-                                            }),
-                                    dmc.ActionIcon(
-                                        DashIconify(
-                                            icon='iconoir:xmark-circle', 
-                                            width=20
-                                        ),
-                                        size='lg',
-                                        n_clicks=0,
-                                        color='red',
-                                        variant='subtle',
-                                        id={
-                                            'type': 'delete_debt',
-                                            'index': current_debt_index
-                                            }
-                                        ),
-                                ])
-                            ], justify="flex-end"),
-                            span=3
-                        )
-                    ], gutter="xs"),
-                    dmc.Stack([
-                        dmc.Text(f"${float(balance):,.2f} Balance with {float(rate):,.2f}% Interest Rate", size="xs"),
-                        # dmc.Text(f"Rate: {float(rate):,.2f}%", size="xs"),
-                        dmc.Text(f"Paying ${float(payment_amount):,.2f} Every {frequency[:-2]}", size="xs"),
-                        # dmc.Text(f"{frequency} Payments", size="xs"),
-                        dmc.Text(f"Next Payment On {next_payment_date}", size="xs")
-                    ], gap=2)
-                ], p="sm")
-            ], style={"borderColor": debt_color, "width": "100%", "maxWidth": "calc(100vw - 48px)"}, withBorder=True),
-            html.Hr()], 
-            id={'type': 'debt_cards', 'index': current_debt_index})
-        
-        # Add to debt details store data
+        # Add to debt details store data. Only the debt's fields are stored;
+        # its card is rendered from them.
         updated_debt_details = debt_details_data.copy()
         updated_debt_details[str(current_debt_index)] = {
             'name': name,
@@ -174,23 +163,39 @@ def register_callbacks(app):
             'frequency': frequency,
             'next_payment_date': next_payment_date,
             # 'traces': traces,
-            'color': debt_color,
-            'card': debt_details_card
+            'color': debt_color
         }
 
-        # Create list of debt detail cards from the store data
-        debt_detail_cards = []
-        for debt_index, debt_data in updated_debt_details.items():
-            if 'card' in debt_data:
-                debt_detail_cards.append(debt_data['card'])
+        # Send only the new or edited card rather than every card
+        with phase('cards'):
+            debt_detail_card = h.create_debt_card(
+                current_debt_index, 
+                updated_debt_details[str(current_debt_index)])
+        debt_detail_cards = Patch()
+        if str(current_debt_index) in debt_details_data:
+            position = h.debt_card_position(
+                debt_details_data, current_debt_index)
+            debt_detail_cards[position] = debt_detail_card
+        else:
+            debt_detail_cards.append(debt_detail_card)
+
+        try:
+            with phase('session'):
+                updated_amortizations = ss.save_amortizations(
+                    updated_amortizations, stored_amortizations)
+        except ss.SessionStoreFullError as error:
+            return (no_update, no_update, no_update, no_update, str(error), 
+                    no_update, no_update)
 
         return (updated_amortizations, updated_debt_details, 
-                debt_detail_cards, False)
+                debt_detail_cards, False, None, amortizations_change, 
+                next_debt_index)
 
     @app.callback(
         Output('amortizations-store', 'data', allow_duplicate=True),
         Output('debt-details-store', 'data', allow_duplicate=True),
         Output('debt_cards_container', 'children', allow_duplicate=True),
+        Output('amortizations-change-store', 'data', allow_duplicate=True),
         Input({'type': 'delete_debt', 'index': ALL}, 'n_clicks'),
         State('amortizations-store', 'data'),
         State('debt-details-store', 'data'),
@@ -203,7 +208,7 @@ def register_callbacks(app):
         """
         ctx = callback_context
         if not ctx.triggered:
-            return no_update, no_update, no_update
+            return no_update, no_update, no_update, no_update
             
         try:
             # Get the triggered component ID
@@ -215,29 +220,46 @@ def register_callbacks(app):
             
             # Check if any clicks happened (only needed for the first initialization)
             if not any(click and click > 0 for click in delete_clicks):
-                return no_update, no_update, no_update
+                return no_update, no_update, no_update, no_update
             
-            # Remove the debt from amortizations data
+            # Remove the debt from amortizations data. If the session has
+            # expired, leave everything as it is rather than save a list
+            # missing the other debts; adding a debt reports the expiry.
+            stored_amortizations = amortizations_data
+            try:
+                amortizations_data = ss.load_amortizations(amortizations_data)
+            except ss.SessionExpiredError:
+                return no_update, no_update, no_update, no_update
             updated_amortizations = [
                 amort for amort in amortizations_data 
                 if amort.get('debt_index') != debt_index
             ]
+            amortizations_change = no_update
+            for position, amort in enumerate(amortizations_data):
+                if amort.get('debt_index') == debt_index:
+                    amortizations_change = {
+                        'operation': 'delete',
+                        'debt_index': debt_index,
+                        'position': position
+                    }
             
-            # Remove the debt from debt details data
+            # Remove the debt from debt details data, and only its card from
+            # the container
             updated_debt_details = debt_details_data.copy()
+            debt_cards = Patch()
             if str(debt_index) in updated_debt_details:
+                del debt_cards[h.debt_card_position(
+                    updated_debt_details, debt_index)]
                 del updated_debt_details[str(debt_index)]
             
-            # Create updated list of debt cards
-            debt_cards = []
-            for index, debt_data in updated_debt_details.items():
-                if 'card' in debt_data:
-                    debt_cards.append(debt_data['card'])
+            updated_amortizations = ss.save_amortizations(
+                updated_amortizations, stored_amortizations)
             
-            return updated_amortizations, updated_debt_details, debt_cards
+            return (updated_amortizations, updated_debt_details, debt_cards, 
+                    amortizations_change)
             
         except Exception as e:
             print(f"ERROR in delete_debt: {e}")
             import traceback
             traceback.print_exc()
-            return no_update, no_update, no_update
\ No newline at end of file
+            return no_update, no_update, no_update, no_update
\ No newline at end of file
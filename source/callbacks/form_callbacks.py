@@ -10,7 +10,97 @@ import json
 def register_callbacks(app):
     """Register form-related callbacks."""
     
-    @app.callback(
+    # Validates the debt form for both add and edit modes in the browser, so
+    # typing in the form never waits on the server. Checks for logical
+    # errors and enables/disables the submit button. The engine checks the
+    # terms again when the form is submitted.
+    app.clientside_callback(
+        f"""
+        function(name, balance, interestRate, paymentAmount, paymentFrequency,
+                 nextPaymentDate, formState, debtDetails) {{
+            const filled = (value) => (
+                value !== null && value !== undefined
+                && String(value).trim().length > 0);
+            const paymentFrequencyDays = {json.dumps(c.PAYMENT_FREQUENCY_DAYS)};
+
+            // Get form mode and debt index
+            const mode = (formState || {{}}).mode || 'add';
+            const debtIndex = (formState || {{}}).debt_index;
+
+            let paymentAmountError = null;
+            let balanceError = null;
+            let interestRateError = null;
+
+            // Check if payment exceeds balance
+            if (filled(balance) && filled(paymentAmount)
+                    && Number(balance) < Number(paymentAmount)) {{
+                paymentAmountError = "The payment amount exceeds the balance";
+                balanceError = "The payment amount exceeds the balance";
+            }}
+
+            // Check if interest rate is within valid range
+            if (filled(interestRate)) {{
+                if (Number(interestRate) <= 0) {{
+                    interestRateError = "Interest rate must be greater than zero";
+                }} else if (Number(interestRate) > {c.MAX_INTEREST_RATE}) {{
+                    interestRateError = "Interest rate cannot exceed {c.MAX_INTEREST_RATE}%";
+                }}
+            }}
+
+            // Check if payment covers the interest that accrues each period
+            const paymentFields = [
+                balance, interestRate, paymentAmount, paymentFrequency];
+            const paymentFieldsFilled = paymentFields.every(filled);
+            if (paymentFieldsFilled) {{
+                const periodInterest = (
+                    Number(balance) * Number(interestRate)
+                    * (paymentFrequencyDays[paymentFrequency]
+                       / {c.DAYS_IN_YEAR_FOR_PERCENTAGE}));
+                if (periodInterest > Number(paymentAmount)) {{
+                    paymentAmountError = "This payment doesn't cover the interest that accrues each period";
+                    interestRateError = "Payment doesn't cover the interest";
+                }}
+            }}
+
+            const errors = [paymentAmountError, balanceError, interestRateError];
+            const invalid = [...errors, true, false];
+
+            // Disable submit until every field is filled
+            if (!paymentFieldsFilled
+                    || ![name, nextPaymentDate].every(filled)) {{
+                return invalid;
+            }}
+
+            // In edit mode, disable submit until something has changed
+            if (mode === 'edit' && debtIndex !== null && debtIndex !== undefined) {{
+                const originalDebt = (debtDetails || {{}})[String(debtIndex)] || {{}};
+                const currentValues = {{
+                    name: name,
+                    balance: balance,
+                    rate: interestRate,
+                    payment_amount: paymentAmount,
+                    frequency: paymentFrequency,
+                    next_payment_date: nextPaymentDate
+                }};
+                const hasChanged = Object.keys(currentValues).some((key) => {{
+                    const original = originalDebt[key];
+                    return String(currentValues[key]) !== (
+                        original === null || original === undefined
+                            ? '' : String(original));
+                }});
+                if (!hasChanged) {{
+                    return invalid;
+                }}
+            }}
+
+            if (errors.some((error) => error !== null)) {{
+                return invalid;
+            }}
+
+            // Everything is valid
+            return [null, null, null, false, true];
+        }}
+        """,
         Output('payment_amount', 'error'),
         Output('balance', 'error'),
         Output('interest_rate', 'error'),
@@ -28,117 +118,6 @@ def register_callbacks(app):
         State('debt-details-store', 'data'),
         prevent_initial_call=True
     )
-    def validate_debt_form(
-        name, balance, interest_rate, payment_amount, payment_frequency, 
-        next_payment_date, form_state, debt_details):
-        """
-        Validates debt form for both add and edit modes.
-        Checks for logical errors and enables/disables the submit button.
-        """
-        
-        # Get form mode and debt index
-        mode = form_state.get('mode', 'add')
-        debt_index = form_state.get('debt_index')
-        
-        # Check if all fields have values
-        payment_amount_args = [
-            balance, interest_rate, payment_amount, payment_frequency
-        ]
-
-        # Validation logic (same for both modes)
-        # Initialize error values
-        payment_amount_error = None
-        balance_error = None
-        interest_rate_error = None
-        
-        # Check if balance and payment_amount are filled and valid
-        if (len(str(balance).strip()) > 0 
-            and len(str(payment_amount).strip()) > 0):
-            # Check if payment exceeds balance
-            if float(balance) < float(payment_amount):
-                payment_amount_error = "The payment amount exceeds the balance"
-                balance_error = "The payment amount exceeds the balance"
-                
-        # Validate interest rate if provided
-        if interest_rate is not None and len(str(interest_rate).strip()) > 0:
-            # Check if interest rate is within valid range
-            if float(interest_rate) <= 0:
-                interest_rate_error = "Interest rate must be greater than zero"
-            elif float(interest_rate) > 100:
-                interest_rate_error = "Interest rate cannot exceed 100%"
-        
-        # Continue with additional validation if all necessary fields are filled
-        if all(i is not None and len(str(i)) > 0 for i in payment_amount_args):
-            # Calculate period interest
-            days = c.PAYMENT_FREQUENCY_DAYS
-            period_interest = (
-                float(balance) 
-                * float(interest_rate) 
-                * (days[payment_frequency]/c.DAYS_IN_YEAR_FOR_PERCENTAGE)
-            )
-            
-            # Check if payment covers interest
-            if period_interest > float(payment_amount):
-                # Payment doesn't cover interest
-                payment_amount_error = "This payment doesn't cover the interest that accrues each period"
-                interest_rate_error = "Payment doesn't cover the interest"
-                
-        # If validation fails for missing fields, disable submit button
-        if not all(i is not None and len(str(i).strip()) > 0 for i in payment_amount_args):
-            # Not all payment fields filled
-            return payment_amount_error, balance_error, interest_rate_error, True, False
-        
-        # Check all fields are filled
-        all_fields = [name, balance, interest_rate, payment_amount, 
-                    payment_frequency, next_payment_date]
-        if not all(i is not None and str(i).strip() for i in all_fields):
-            # Not all fields filled
-            return payment_amount_error, balance_error, interest_rate_error, True, False
-        
-        # Additional check for edit mode - has anything changed?
-        if mode == 'edit' and debt_index is not None:
-            # Get original values
-            original_debt = debt_details.get(str(debt_index), {})
-            
-            # Compare current values with original
-            current_values = {
-                'name': name,
-                'balance': str(balance),
-                'rate': str(interest_rate),
-                'payment_amount': str(payment_amount),
-                'frequency': payment_frequency,
-                'next_payment_date': next_payment_date
-            }
-            
-            # Check if any value has changed
-            has_changed = False
-            for key, current_value in current_values.items():
-                # Map keys to match debt_details structure
-                original_key = key
-                if key == 'rate':
-                    original_key = 'rate'
-                elif key == 'payment_amount':
-                    original_key = 'payment_amount'
-                elif key == 'frequency':
-                    original_key = 'frequency'
-                elif key == 'next_payment_date':
-                    original_key = 'next_payment_date'
-                    
-                original_value = str(original_debt.get(original_key, ''))
-                if str(current_value) != original_value:
-                    has_changed = True
-                    break
-            
-            if not has_changed:
-                # No changes made in edit mode
-                return payment_amount_error, balance_error, interest_rate_error, True, False
-        
-        # All validations passed - if we have errors, still disable submit button
-        if payment_amount_error or balance_error or interest_rate_error:
-            return payment_amount_error, balance_error, interest_rate_error, True, False
-        
-        # Everything is valid
-        return None, None, None, False, True
 
     @app.callback(
         Output('debt_form_drawer', 'opened'),
@@ -0,0 +1,45 @@
+"""Payoff plan comparison callbacks."""
+
+from dash.dependencies import Input, Output, State
+from source import plans
+from source.instrumentation import phase
+from source.utils import helpers as h
+
+
+def register_callbacks(app):
+    """Register plan-related callbacks."""
+    
+    # Only ask the server to compare plans once the Plans tab is open, and
+    # only if the debts have changed since they were last compared
+    app.clientside_callback(
+        """
+        function(activeTab, modifiedTimestamp, renderedTimestamp) {
+            if (activeTab !== 'plans' || modifiedTimestamp === undefined
+                    || modifiedTimestamp < 0
+                    || modifiedTimestamp === renderedTimestamp) {
+                return window.dash_clientside.no_update;
+            }
+            return modifiedTimestamp;
+        }
+        """,
+        Output('plans-marker-store', 'data'),
+        Input('main_tabs', 'value'),
+        Input('debt-details-store', 'modified_timestamp'),
+        State('plans-marker-store', 'data'),
+        prevent_initial_call=True
+    )
+    
+    @app.callback(
+        Output('plan_details_view', 'children'),
+        Input('plans-marker-store', 'data'),
+        State('debt-details-store', 'data'),
+        prevent_initial_call=True
+    )
+    def update_plan_comparison(plans_marker, debt_details_data):
+        """
+        Runs every payoff plan over the debts and shows how each one does.
+        """
+        with phase('plans'):
+            plan_results = plans.compare_plans(
+                plans.debts_from_store(debt_details_data or {}))
+        return h.create_plan_comparison(plan_results)
@@ -1,131 +1,545 @@
 """Visualization and data display callbacks."""
 
-from dash import html, no_update
-from dash.dependencies import Input, Output
+from dash import callback_context, dash_table, html, no_update, Patch
+from dash.dependencies import Input, Output, State, MATCH
+from functools import lru_cache
 import dash_mantine_components as dmc
 import plotly.graph_objects as go
+from source import background
+from source import payment_calendar as pc
+from source import session_store as ss
+from source.instrumentation import phase
+from source.config import (
+    PAYOFF_GRAPH_MAX_POINTS,
+    PAYOFF_GRAPH_RENDERER,
+    PAYOFF_GRAPH_WEBGL_POINTS
+)
 from source.utils import constants as c
+from source.utils import decimation
+from source.utils import store_codec
+import json
+import numpy as np
+
+
+class DecodedSchedules():
+    """
+    The amortizations-store schedules, each decoded the first time it's
+    needed. Every output built in one callback shares the same instance, so
+    no schedule is decoded twice per request.
+    """
+    def __init__(self, amortizations_data):
+        self.amortizations_data = amortizations_data or []
+        self._decoded = {}
+
+    def __getitem__(self, position):
+        if position not in self._decoded:
+            self._decoded[position] = store_codec.decode_schedule(
+                self.amortizations_data[position]['schedule'])
+        return self._decoded[position]
+
+
+def create_payoff_layout():
+    """
+    Builds the payoff graph layout: the plotly_dark template with minimal
+    margins and no interactions.
+    """
+    fig = go.Figure(layout=go.Layout(template='plotly_dark'))
+    fig.update_layout(
+        yaxis=dict(
+            tickprefix='$',
+            tickformat='.1f',
+            ticksuffix='K',
+            nticks=5,
+            fixedrange=True
+        ),
+        xaxis=dict(
+            fixedrange=True
+        ),
+        showlegend=False,
+        margin=dict(l=20, r=10, t=10, b=20)
+    )
+    return fig.layout.to_plotly_json()
+
+
+@lru_cache(maxsize=1)
+def payoff_layout():
+    """
+    The payoff graph layout, built on first use. Validating the layout and
+    merging in the template takes plotly hundreds of milliseconds the first
+    time, as it loads its validators, so it's kept off the import path and
+    done once. Every figure shares this dict, so it must be treated as
+    read-only.
+    """
+    return create_payoff_layout()
+
+
+def trace_uid(amort_data):
+    """The uid of a debt's payoff graph trace: its debt index."""
+    return str(amort_data.get('debt_index', 0))
+
+
+def kept_points(periods):
+    """How many of a schedule's points its payoff graph trace keeps."""
+    if PAYOFF_GRAPH_MAX_POINTS < 3:
+        return periods
+    return min(periods, PAYOFF_GRAPH_MAX_POINTS)
+
+
+def payoff_trace_type(amortizations_data):
+    """
+    The trace type of every payoff graph trace: WebGL once the points sent
+    for the whole figure pass `PAYOFF_GRAPH_WEBGL_POINTS`, as it's the
+    number of points in one plot that slows SVG down, and SVG otherwise.
+    """
+    points = sum(kept_points(amort_data['schedule']['periods'])
+                 for amort_data in amortizations_data or [])
+    return 'scattergl' if points > PAYOFF_GRAPH_WEBGL_POINTS else 'scatter'
+
+
+def create_payoff_trace(amort_data, schedule, trace_type):
+    """
+    Builds the payoff graph trace for one stored amortization from its
+    decoded schedule, as a plain dict that skips plotly's validation. A
+    payoff curve is smooth, so long schedules are downsampled to
+    `PAYOFF_GRAPH_MAX_POINTS` without visibly changing it.
+    """
+    dates = schedule['dates']
+    balance = schedule['balance']
+    kept = decimation.lttb(
+        np.asarray(dates, dtype='datetime64[D]').astype(np.int64), balance,
+        PAYOFF_GRAPH_MAX_POINTS)
+    # Use the raw data, converting to thousands for K format
+    return {
+        'line': {'color': amort_data.get('color', '#000000')},
+        'name': amort_data.get('name', 'Unknown Debt'),
+        'uid': trace_uid(amort_data),
+        'x': [dates[i] for i in kept],
+        'y': balance[kept] / c.FORMATTING_DIVISOR,
+        'type': trace_type
+    }
+
+
+def create_payoff_figure(amortizations_data, schedules=None):
+    """Builds the whole payoff graph, one trace per debt."""
+    if schedules is None:
+        schedules = DecodedSchedules(amortizations_data)
+    trace_type = payoff_trace_type(amortizations_data)
+    return {
+        'data': [
+            create_payoff_trace(amort_data, schedules[position], trace_type)
+            for position, amort_data in enumerate(amortizations_data or [])],
+        'layout': payoff_layout()
+    }
+
+
+def patch_payoff_figure(amortizations_change, amortizations_data,
+                        schedules=None):
+    """
+    Updates only the trace of the debt that changed. Traces are kept in the
+    same order as the amortizations store, so the change's position in the
+    store is also the position of its trace, as long as the graph has every
+    update before this one and its traces are already of the type the
+    change leaves them; `update_payoff_figure` checks both.
+    """
+    if schedules is None:
+        schedules = DecodedSchedules(amortizations_data)
+    operation = amortizations_change['operation']
+    position = amortizations_change['position']
+    patch = Patch()
+    if operation == 'delete':
+        del patch['data'][position]
+        return patch
+    trace = create_payoff_trace(
+        amortizations_data[position], schedules[position],
+        payoff_trace_type(amortizations_data))
+    if operation == 'edit':
+        patch['data'][position] = trace
+    else:
+        patch['data'].append(trace)
+    return patch
+
+
+def expected_trace_uids(amortizations_change, amortizations_data):
+    """
+    The uids of the traces the payoff graph should show before the change
+    is applied, given the amortizations store after it.
+    """
+    uids = [trace_uid(amort_data) for amort_data in amortizations_data]
+    operation = amortizations_change['operation']
+    if operation == 'add':
+        return uids[:-1]
+    if operation == 'delete':
+        uids.insert(amortizations_change['position'],
+                    str(amortizations_change['debt_index']))
+    return uids
+
+
+def update_payoff_figure(amortizations_change, amortizations_data,
+                         traces=None, schedules=None):
+    """
+    Updates the payoff graph for a debt being added, edited or deleted.
+    Only the changed debt's trace is sent when the graph's traces, whose
+    uids and type are given by `traces`, are the ones the store had before
+    the change and already of the type it needs. Otherwise, as when the
+    graph still shows its placeholder trace, missed an earlier update that
+    was cancelled or superseded, or has to switch to or from WebGL, it's
+    built in full.
+    """
+    if (not amortizations_change or not amortizations_data or not traces
+            or traces['uids'] != expected_trace_uids(
+                amortizations_change, amortizations_data)
+            or traces['type'] != payoff_trace_type(amortizations_data)):
+        return create_payoff_figure(amortizations_data, schedules)
+    return patch_payoff_figure(
+        amortizations_change, amortizations_data, schedules)
+
+
+def create_amortization_table(amort_data, schedule=None):
+    """
+    Builds a paginated table for one stored amortization. Only the first
+    page is sent with the table; the rest are served by
+    `update_amortization_table_page` as the user pages through, so the
+    table costs the same to render however long the schedule is. The
+    first page is read from `schedule` if it's already been decoded.
+    """
+    columns = ['Payment Date', *store_codec.SCHEDULE_COLUMNS.values()]
+    return dash_table.DataTable(
+        id={'type': 'amortization_table',
+            'index': amort_data.get('debt_index', 0)},
+        columns=[{'name': col, 'id': col} for col in columns],
+        data=store_codec.schedule_page(
+            amort_data['schedule'], 0, c.AMORTIZATION_TABLE_PAGE_SIZE,
+            decoded=schedule),
+        page_action='custom',
+        page_current=0,
+        page_size=c.AMORTIZATION_TABLE_PAGE_SIZE,
+        page_count=store_codec.page_count(
+            amort_data['schedule'], c.AMORTIZATION_TABLE_PAGE_SIZE),
+        style_table={'overflowX': 'auto'},
+        # Match the dark styling of table-styles.css
+        style_cell={
+            'backgroundColor': 'rgba(30, 30, 40, 0.1)',
+            'color': '#d4d4d4',
+            'border': '1px solid #444444',
+            'fontSize': '0.85rem',
+            'padding': '4px 8px',
+            'textAlign': 'left'
+        },
+        style_header={
+            'backgroundColor': 'rgba(20, 20, 30, 0.7)',
+            'color': '#eaeaea',
+            'fontWeight': 600
+        },
+        style_data_conditional=[{
+            'if': {'row_index': 'odd'},
+            'backgroundColor': 'rgba(40, 40, 50, 0.2)'
+        }]
+    )
+
+
+def create_amortization_cards(amortizations_data, schedules=None):
+    """
+    Builds amortization table components from store data.
+    """
+    if not amortizations_data:
+        return html.Div("No debts added yet.", className="text-center p-3")
+    
+    amortization_cards = []
+    
+    for position, amort_data in enumerate(amortizations_data):
+        name = amort_data.get('name', 'Debt')
+        debt_index = amort_data.get('debt_index', 0)
+        debt_color = amort_data.get('color', '#000000')
+        schedule = schedules[position] if schedules is not None else None
+        
+        # Create visual component for each amortization
+        amortization_card = html.Div([
+            dmc.Card([
+                dmc.CardSection([
+                    html.H4(name, className='card_title'),
+                    html.Hr(),
+                    create_amortization_table(amort_data, schedule)
+                ], p="md")
+            ], style={"borderColor": debt_color}, withBorder=True),
+            html.Hr()],
+            id={'type': 'amortization_cards', 'index': debt_index})
+            
+        amortization_cards.append(amortization_card)
+    
+    return amortization_cards
+
+
+def create_payoff_graph_renderer():
+    """
+    Returns the clientside callback that builds the payoff graph in the
+    browser from amortizations-store, decoding each schedule's balances and
+    laying out its payment dates the same way as `store_codec` and
+    `payment_calendar`. The figure layout is `payoff_layout()`. Traces are
+    downsampled and typed the same way as `create_payoff_trace`, with the
+    same port of `decimation.lttb`, so the graph draws the same points with
+    either renderer.
+    """
+    layout = json.dumps(payoff_layout())
+    return f"""
+        function(amortizationsData) {{
+            const layout = {layout};
+
+            function decodeColumn(value, encoding) {{
+                if (encoding !== 'base64') {{
+                    return value;
+                }}
+                const bytes = atob(value);
+                const view = new DataView(new ArrayBuffer(bytes.length));
+                for (let i = 0; i < bytes.length; i++) {{
+                    view.setUint8(i, bytes.charCodeAt(i));
+                }}
+                const cents = new Array(bytes.length / 4);
+                for (let i = 0; i < cents.length; i++) {{
+                    cents[i] = view.getInt32(i * 4, true);
+                }}
+                return cents;
+            }}
+
+            // decimation.lttb: the indices of at most maxPoints points
+            function lttb(x, y, maxPoints) {{
+                const n = x.length;
+                if (maxPoints < 3 || maxPoints >= n) {{
+                    return Array.from({{length: n}}, (_, i) => i);
+                }}
+                const step = (n - 2) / (maxPoints - 2);
+                const edges = Array.from(
+                    {{length: maxPoints - 1}}, (_, i) => Math.floor(1 + i * step));
+                edges[maxPoints - 2] = n - 1;
+                const xSums = [0];
+                const ySums = [0];
+                for (let i = 0; i < n; i++) {{
+                    xSums.push(xSums[i] + x[i]);
+                    ySums.push(ySums[i] + y[i]);
+                }}
+                const kept = [0];
+                let previous = 0;
+                for (let bucket = 0; bucket < maxPoints - 2; bucket++) {{
+                    const nextStart = bucket < maxPoints - 3
+                        ? edges[bucket + 1] : n - 1;
+                    const nextStop = bucket < maxPoints - 3
+                        ? edges[bucket + 2] : n;
+                    const count = nextStop - nextStart;
+                    const nextX = (xSums[nextStop] - xSums[nextStart]) / count;
+                    const nextY = (ySums[nextStop] - ySums[nextStart]) / count;
+                    const previousX = x[previous];
+                    const previousY = y[previous];
+                    let largest = -1;
+                    let candidate = edges[bucket];
+                    for (let i = edges[bucket]; i < edges[bucket + 1]; i++) {{
+                        const area = Math.abs(
+                            (previousX - nextX) * (y[i] - previousY)
+                            - (previousX - x[i]) * (nextY - previousY));
+                        if (area > largest) {{
+                            largest = area;
+                            candidate = i;
+                        }}
+                    }}
+                    previous = candidate;
+                    kept.push(previous);
+                }}
+                kept.push(n - 1);
+                return kept;
+            }}
+
+            function formatDate(date) {{
+                return date.toISOString().slice(0, 10);
+            }}
+
+            function paymentDates(firstPaymentDate, frequency, periods) {{
+                const intervalDays = {json.dumps(pc.PAYMENT_INTERVAL_DAYS)};
+                frequency = frequency.charAt(0).toUpperCase()
+                    + frequency.slice(1).toLowerCase();
+                const [year, month, day] = firstPaymentDate.split('-').map(Number);
+                const dates = new Array(periods);
+                for (let n = 0; n < periods; n++) {{
+                    if (frequency === 'Monthly') {{
+                        // Fall back to the last day of months that are too
+                        // short for the first payment's day
+                        const monthLength = new Date(
+                            Date.UTC(year, month - 1 + n + 1, 0)).getUTCDate();
+                        dates[n] = formatDate(new Date(Date.UTC(
+                            year, month - 1 + n, Math.min(day, monthLength))));
+                    }} else {{
+                        dates[n] = formatDate(new Date(Date.UTC(
+                            year, month - 1, day + n * intervalDays[frequency])));
+                    }}
+                }}
+                return dates;
+            }}
+
+            const maxPoints = {PAYOFF_GRAPH_MAX_POINTS};
+            const keptPoints = (periods) =>
+                maxPoints < 3 ? periods : Math.min(periods, maxPoints);
+            const points = (amortizationsData || []).reduce(
+                (total, amortData) =>
+                    total + keptPoints(amortData.schedule.periods), 0);
+            const type = points > {PAYOFF_GRAPH_WEBGL_POINTS}
+                ? 'scattergl' : 'scatter';
+            const data = (amortizationsData || []).map((amortData) => {{
+                const schedule = amortData.schedule;
+                const balance = decodeColumn(
+                    schedule.columns.balance, schedule.encoding).map(
+                        (cents) => cents / 100);
+                const dates = schedule.periods ? paymentDates(
+                    schedule.first_payment_date, schedule.frequency,
+                    schedule.periods) : [];
+                const kept = lttb(
+                    dates.map((date) => Date.parse(date) / 86400000), balance,
+                    maxPoints);
+                return {{
+                    line: {{color: amortData.color || '#000000'}},
+                    name: amortData.name || 'Unknown Debt',
+                    uid: String(amortData.debt_index || 0),
+                    x: kept.map((i) => dates[i]),
+                    // Convert to thousands for K format
+                    y: kept.map((i) => balance[i] / {c.FORMATTING_DIVISOR}),
+                    type: type
+                }};
+            }});
+            return {{data: data, layout: layout}};
+        }}
+        """
 
 
 def register_callbacks(app):
     """Register visualization-related callbacks."""
     
-    @app.callback(
-        Output('payoff_graph', 'figure', allow_duplicate=True),
-        Input('amortizations-store', 'data'),
+    # Only ask the server for the tables once Table View is open, and only if
+    # the debts have changed since they were last built. Switching tabs back
+    # and forth, or adding debts while the graph is showing, costs nothing.
+    app.clientside_callback(
+        """
+        function(activeTab, modifiedTimestamp, renderedTimestamp) {
+            if (activeTab !== 'table_view' || modifiedTimestamp === undefined
+                    || modifiedTimestamp < 0
+                    || modifiedTimestamp === renderedTimestamp) {
+                return window.dash_clientside.no_update;
+            }
+            return modifiedTimestamp;
+        }
+        """,
+        Output('amortization-tables-marker-store', 'data'),
+        Input('visualization_tabs', 'value'),
+        Input('amortizations-store', 'modified_timestamp'),
+        State('amortization-tables-marker-store', 'data'),
         prevent_initial_call=True
     )
-    def update_payoff_graph(amortizations_data):
-        """Builds the payoff graph from the stored amortization data"""
-        # Create a new figure from scratch using the plotly_dark template
-        fig = go.Figure(layout=go.Layout(template='plotly_dark'))
+    
+    if PAYOFF_GRAPH_RENDERER == 'client' and ss.session_store is None:
+        # The browser builds the graph itself whenever the store changes, so
+        # graph updates cost the server nothing
+        app.clientside_callback(
+            create_payoff_graph_renderer(),
+            Output('payoff_graph', 'figure', allow_duplicate=True),
+            Input('amortizations-store', 'data'),
+            prevent_initial_call=True
+        )
         
-        if not amortizations_data:
-            # Configure empty state with minimal margins and no interactions
-            fig.update_layout(
-                yaxis=dict(
-                    tickprefix='$',
-                    tickformat='.1f',
-                    ticksuffix='K',
-                    nticks=5,
-                    fixedrange=True
-                ),
-                xaxis=dict(
-                    fixedrange=True
-                ),
-                showlegend=False,
-                margin=dict(l=20, r=10, t=10, b=20)
-            )
-            return fig
+        @app.callback(
+            Output('amortization_schedule', 'children'),
+            Input('amortization-tables-marker-store', 'data'),
+            State('amortizations-store', 'data'),
+            prevent_initial_call=True
+        )
+        def update_amortization_tables(tables_marker, amortizations_data):
+            """Builds the amortization tables when Table View needs them."""
+            try:
+                amortizations_data = ss.load_amortizations(amortizations_data)
+            except ss.SessionExpiredError:
+                return no_update
+            return create_amortization_cards(amortizations_data)
+    
+    else:
+        # Tracks which traces the graph actually shows, so a patch is only
+        # sent against the figure it was built for
+        app.clientside_callback(
+            """
+            function(figure) {
+                const data = (figure && figure.data) || [];
+                return {
+                    uids: data.map(
+                        (trace) => trace.uid === undefined ? null : trace.uid),
+                    type: data.length ? data[0].type : null
+                };
+            }
+            """,
+            Output('payoff-graph-traces-store', 'data'),
+            Input('payoff_graph', 'figure'),
+            prevent_initial_call=True
+        )
         
-        # Add trace for each debt
-        for amort_data in amortizations_data:
-            name = amort_data.get('name', 'Unknown Debt')
-            debt_color = amort_data.get('color', '#000000')
-            raw_data = amort_data.get('raw_data', {})
+        @background.callback(
+            app,
+            Output('payoff_graph', 'figure', allow_duplicate=True),
+            Output('amortization_schedule', 'children'),
+            Input('amortizations-change-store', 'data'),
+            Input('amortization-tables-marker-store', 'data'),
+            State('amortizations-store', 'data'),
+            State('payoff-graph-traces-store', 'data'),
+            progress=[Output('visualizations_progress', 'value'),
+                      Output('visualizations_progress', 'style')],
+            progress_default=[0, {'display': 'none'}],
+            prevent_initial_call=True
+        )
+        def update_visualizations(set_progress, amortizations_change,
+                                  tables_marker, amortizations_data,
+                                  traces):
+            """
+            Updates the payoff graph and, when Table View needs them, the
+            amortization tables in a single request. The store is uploaded
+            and parsed once, and both outputs share its decoded schedules.
+            """
+            triggered = {
+                trigger['prop_id'].split('.')[0]
+                for trigger in callback_context.triggered}
+            # An expired session leaves the views as they are; adding a debt
+            # tells the user
+            try:
+                with phase('session'):
+                    amortizations_data = ss.load_amortizations(
+                        amortizations_data)
+            except ss.SessionExpiredError:
+                return no_update, no_update
+            schedules = DecodedSchedules(amortizations_data)
+            set_progress((20, {'display': 'block'}))
             
-            # Add trace using the raw data, converting to thousands for K format
-            balances = raw_data.get('balances', [])
-            balances_in_thousands = [balance / c.FORMATTING_DIVISOR for balance in balances]
+            figure = no_update
+            if 'amortizations-change-store' in triggered:
+                with phase('figure'):
+                    figure = update_payoff_figure(
+                        amortizations_change, amortizations_data, traces,
+                        schedules)
+                set_progress((50, {'display': 'block'}))
             
-            fig.add_trace(go.Scatter(
-                x=raw_data.get('dates', []),
-                y=balances_in_thousands,
-                line={'color': debt_color},
-                name=name
-            ))
-        
-        # Configure layout with minimal margins and no interactions
-        fig.update_layout(
-            yaxis=dict(
-                tickprefix='$',
-                tickformat='.1f', 
-                ticksuffix='K',
-                nticks=5,
-                fixedrange=True
-            ),
-            xaxis=dict(
-                fixedrange=True
-            ),
-            showlegend=False,
-            margin=dict(l=20, r=10, t=10, b=20)
-        )
-        
-        return fig
+            amortization_cards = no_update
+            if 'amortization-tables-marker-store' in triggered:
+                with phase('tables'):
+                    amortization_cards = create_amortization_cards(
+                        amortizations_data, schedules)
+            
+            return figure, amortization_cards
     
     @app.callback(
-        Output('amortization_schedule', 'children'),
-        Input('amortizations-store', 'data'),
+        Output({'type': 'amortization_table', 'index': MATCH}, 'data'),
+        Input({'type': 'amortization_table', 'index': MATCH}, 'page_current'),
+        State('amortizations-store', 'data'),
         prevent_initial_call=True
     )
-    def update_amortization_tables(amortizations_data):
-        """
-        Builds amortization table components from store data.
-        """
-        if not amortizations_data:
-            return html.Div("No debts added yet.", className="text-center p-3")
-        
-        amortization_cards = []
-        
+    def update_amortization_table_page(page_current, amortizations_data):
+        """Serves the rows of the page the user moved to."""
+        debt_index = callback_context.triggered_id['index']
+        try:
+            amortizations_data = ss.load_amortizations(amortizations_data)
+        except ss.SessionExpiredError:
+            return no_update
         for amort_data in amortizations_data:
-            name = amort_data.get('name', 'Debt')
-            debt_index = amort_data.get('debt_index', 0)
-            debt_color = amort_data.get('color', '#000000')
-            table_data = amort_data.get('table_data', [])
-            columns = amort_data.get('columns', [])
-            
-            # Create visual component for each amortization
-            amortization_card = html.Div([
-                dmc.Card([
-                    dmc.CardSection([
-                        html.H4(name, className='card_title'),
-                        html.Hr(),
-                        dmc.Table(
-                            striped="odd",
-                            highlightOnHover=True,
-                            withTableBorder=True,
-                            withColumnBorders=True,
-                            horizontalSpacing="xs",
-                            verticalSpacing="xs",
-                            className="amortization-table",
-                            style={"fontSize": "0.85rem"},
-                            children=[
-                                html.Thead(
-                                    html.Tr([html.Th(col) for col in columns])
-                                ),
-                                html.Tbody([
-                                    html.Tr([
-                                        html.Td(row[col]) 
-                                        for col in columns
-                                    ]) for row in table_data
-                                ])
-                            ]
-                        )
-                    ], p="md")
-                ], style={"borderColor": debt_color}, withBorder=True),
-                html.Hr()],
-                id={'type': 'amortization_cards', 'index': debt_index})
-                
-            amortization_cards.append(amortization_card)
-        
-        return amortization_cards
\ No newline at end of file
+            if amort_data.get('debt_index') == debt_index:
+                return store_codec.schedule_page(
+                    amort_data['schedule'], page_current or 0,
+                    c.AMORTIZATION_TABLE_PAGE_SIZE)
+        return no_update
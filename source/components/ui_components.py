@@ -2,9 +2,7 @@
 
 import dash_mantine_components as dmc
 from dash import html, dcc
-import plotly.graph_objects as go
-import pandas as pd
-from source.utils.helpers import create_plans_coming_soon
+from source.utils.helpers import create_plan_comparison
 from dash_iconify import DashIconify
 
 
@@ -101,20 +99,37 @@ def create_add_plan_controls():
 def create_graph_view_content():
     """Create the graph view content."""
     return dmc.GridCol(dcc.Graph(
-            figure=go.Figure(
-                data=go.Scatter(), 
-                layout=go.Layout(
-                    template='plotly_dark',
-                    yaxis_tickprefix='$', 
-                    yaxis_tickformat=',.2f',
-                    margin=dict(l=40, r=40, t=60, b=40)  # Reduce margins for more space
-                )),
+            # A plain dict with plotly_dark's colors, so that building the 
+            # layout doesn't make plotly load its validators and templates
+            figure={
+                'data': [{'type': 'scatter'}],
+                'layout': {
+                    'paper_bgcolor': 'rgb(17,17,17)',
+                    'plot_bgcolor': 'rgb(17,17,17)',
+                    'font': {'color': '#f2f5fa'},
+                    'xaxis': {'gridcolor': '#283442', 
+                              'zerolinecolor': '#283442'},
+                    'yaxis': {'gridcolor': '#283442', 
+                              'zerolinecolor': '#283442',
+                              'tickprefix': '$', 'tickformat': ',.2f'},
+                    'margin': dict(l=40, r=40, t=60, b=40)  # Reduce margins for more space
+                }},
             id='payoff_graph', 
             style={'width': '100%', 'height': 'calc(95vh - 150px)'},  # Dynamic height based on viewport
             config={'responsive': True, 'displayModeBar': False}), 
         )
 
 
+def create_visualizations_progress():
+    """
+    Create the progress bar shown while a background callback updates the
+    visualizations.
+    """
+    return dmc.Progress(
+        id='visualizations_progress', value=0, size='xs',
+        style={'display': 'none'})
+
+
 def create_amortization_view_content():
     """Create the amortization table view content."""
     return dmc.GridCol([], id='amortization_schedule', span=12)
@@ -174,9 +189,12 @@ def create_debt_details_view_content():
 
 
 def create_plan_details_view_content():
-    """Create the plan details view content."""
+    """
+    Create the plan details view content, which holds the plan comparison
+    once the Plans tab is opened with debts added.
+    """
     return dmc.GridCol(
-        create_plans_coming_soon(), id='plan_details_view', span=12)
+        create_plan_comparison({}), id='plan_details_view', span=12)
 
 
 def create_header_section():
@@ -220,7 +238,20 @@ def create_stores():
     """Create the dcc.Store components for state management."""
     return [
         dcc.Store(id='amortizations-store', data=[]),
+        dcc.Store(id='amortizations-change-store', data=None),
+        # The uids, i.e. debt indices, of the traces the payoff graph shows,
+        # in order, and their type, or None until it shows any
+        dcc.Store(id='payoff-graph-traces-store', data=None),
+        # The amortizations-store modified_timestamp the tables were last
+        # built from
+        dcc.Store(id='amortization-tables-marker-store', data=None),
+        # The debt-details-store modified_timestamp the plans were last
+        # compared for
+        dcc.Store(id='plans-marker-store', data=None),
         dcc.Store(id='debt-details-store', data={}),
+        # The index the next added debt gets. Only ever goes up, so an index
+        # is never reused after its debt is deleted.
+        dcc.Store(id='next-debt-index-store', data=0),
         dcc.Store(id='form-state-store', data={'mode': 'add', 'debt_index': None}),
         html.Div(id='scroll-trigger', style={'display': 'none'}),  # Dummy div for clientside callback
     ]
\ No newline at end of file
@@ -1,6 +1,7 @@
 """Application configuration and settings."""
 
 import os
+import tempfile
 import dash_mantine_components as dmc
 
 
@@ -40,6 +41,108 @@ SECURITY_HEADERS = {
     )
 }
 
+# Amortization result cache, shared by the threads of each worker
+AMORTIZATION_CACHE_CONFIG = {
+    'max_entries': int(os.environ.get('AMORTIZATION_CACHE_MAX_ENTRIES', 256)),
+    'max_bytes': int(os.environ.get(
+        'AMORTIZATION_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+}
+
+# The most years any amortization schedule may run, at whatever payment
+# frequency, so no single request can keep a worker thread busy indefinitely
+MAX_SCHEDULE_YEARS = int(os.environ.get('MAX_SCHEDULE_YEARS', 100))
+
+# How amortization schedules are encoded in amortizations-store; one of
+# store_codec.ENCODINGS
+AMORTIZATION_STORE_ENCODING = os.environ.get(
+    'AMORTIZATION_STORE_ENCODING', 'base64')
+
+# Server-side storage of each session's amortizations. With the backend
+# set to 'sqlite', amortizations-store only holds a reference to them;
+# empty keeps them in the browser.
+SESSION_STORE_CONFIG = {
+    'backend': os.environ.get('SESSION_STORE', ''),
+    'path': os.environ.get(
+        'SESSION_STORE_PATH',
+        os.path.join(tempfile.gettempdir(), 'juggle-sessions.sqlite3')),
+    'max_session_bytes': int(os.environ.get(
+        'SESSION_STORE_MAX_SESSION_BYTES', 4 * 1024 * 1024)),
+    'ttl_seconds': int(os.environ.get(
+        'SESSION_STORE_TTL_SECONDS', 24 * 60 * 60)),
+    'pool_size': int(os.environ.get('SESSION_STORE_POOL_SIZE', 4))
+}
+
+# Where the payoff graph is built: 'server' sends a figure, or a patch of
+# one, from a server callback; 'client' builds it in the browser straight
+# from amortizations-store, and needs the session store to be disabled
+PAYOFF_GRAPH_RENDERER = os.environ.get('PAYOFF_GRAPH_RENDERER', 'server')
+
+# The most points either renderer draws for one payoff graph trace (0 draws
+# them all), and the number of points in the whole graph above which its
+# traces are drawn with WebGL instead of SVG
+PAYOFF_GRAPH_MAX_POINTS = int(os.environ.get('PAYOFF_GRAPH_MAX_POINTS', 400))
+PAYOFF_GRAPH_WEBGL_POINTS = int(
+    os.environ.get('PAYOFF_GRAPH_WEBGL_POINTS', 1000))
+
+# The lowest level of the app's own log messages that are written, e.g.
+# 'WARNING' to silence the periodic metrics and warm-up logs
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+
+# Per-callback timing, sent as Server-Timing headers and logged as
+# histograms of each callback's latency and payload sizes every `log_every`
+# requests to it (0 never logs them)
+INSTRUMENTATION_CONFIG = {
+    'enabled': os.environ.get('INSTRUMENTATION', '1') != '0',
+    'log_every': int(os.environ.get('INSTRUMENTATION_LOG_EVERY', 100))
+}
+
+# The /metrics endpoint and the bearer token scrapers must send to it. It
+# reports callback names, latencies and session counts, so it's only served
+# when a token is set
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_CONFIG = {
+    'enabled': bool(METRICS_TOKEN) and os.environ.get('METRICS', '1') != '0',
+    'token': METRICS_TOKEN
+}
+
+# gunicorn worker processes, 0 for one per CPU available to the container,
+# and the threads each one serves requests with. See gunicorn.conf.py.
+WORKERS = int(os.environ.get('WORKERS', 0))
+WORKER_THREADS = int(os.environ.get('WORKER_THREADS', 8))
+
+# The pool of processes each worker sends CPU-heavy work to, so it doesn't
+# hold up the worker's other threads; see source/offload.py. Schedules are
+# only sent to it from `min_periods` payments, as shorter ones take less
+# time to generate than to send between processes. 0 workers disables it.
+OFFLOAD_CONFIG = {
+    'max_workers': int(os.environ.get('OFFLOAD_WORKERS', 1)),
+    'max_pending': int(os.environ.get('OFFLOAD_MAX_PENDING', 4)),
+    'timeout_seconds': float(os.environ.get('OFFLOAD_TIMEOUT_SECONDS', 10)),
+    'min_periods': int(os.environ.get('OFFLOAD_MIN_PERIODS', 1000))
+}
+
+# Dash background callbacks, which run the heavy callbacks in a separate
+# process and hand their results back through a cache on local disk, so they
+# don't hold a request open; see source/background.py. Needs the
+# `dash[diskcache]` extra. Results are kept for `expire_seconds` until the
+# browser, which polls for them every `interval_ms`, collects them. Jobs
+# send their timings back to the worker for /metrics but skip the
+# amortization cache, whose copy in the job is lost when it exits.
+BACKGROUND_CALLBACK_CONFIG = {
+    'enabled': os.environ.get('BACKGROUND_CALLBACKS', '0') == '1',
+    'cache_dir': os.environ.get(
+        'BACKGROUND_CALLBACK_CACHE_DIR',
+        os.path.join(tempfile.gettempdir(), 'juggle-background-callbacks')),
+    'expire_seconds': int(os.environ.get(
+        'BACKGROUND_CALLBACK_EXPIRE_SECONDS', 60 * 60)),
+    'interval_ms': int(os.environ.get('BACKGROUND_CALLBACK_INTERVAL_MS', 250))
+}
+
+# Whether each worker generates a schedule and builds the payoff graph once at
+# startup, so that the first request to a new instance doesn't wait for the
+# imports and caches that work loads
+WARM_UP = os.environ.get('WARM_UP', '0') == '1'
+
 # Runtime configuration
 def get_runtime_config():
     """Get runtime configuration based on environment."""
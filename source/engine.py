@@ -0,0 +1,705 @@
+"""Array-based amortization engine."""
+
+import math
+import numpy as np
+from source.config import MAX_SCHEDULE_YEARS
+from source.utils import constants as c
+
+
+class AmortizationError(ValueError):
+    """Raised when a debt's terms don't produce a usable schedule."""
+
+
+class NegativeAmortizationError(AmortizationError):
+    """
+    Raised when a payment doesn't cover the interest charged each period.
+    `debts` holds the offending indices when a whole portfolio is checked.
+    """
+    def __init__(self, debts=None):
+        self.debts = debts
+        super().__init__(
+            "This payment doesn't cover the interest that accrues each period")
+
+    def __reduce__(self):
+        # Rebuilt from its own arguments when sent back from a process pool
+        return type(self), (self.debts,)
+
+
+class NonFiniteTermsError(AmortizationError):
+    """
+    Raised when a balance, interest rate or payment isn't a finite number.
+    `debts` holds the offending indices when a whole portfolio is checked.
+    """
+    def __init__(self, debts=None):
+        self.debts = debts
+        super().__init__(
+            "The balance, interest rate and payment must be finite numbers")
+
+    def __reduce__(self):
+        return type(self), (self.debts,)
+
+
+class ScheduleTooLongError(AmortizationError):
+    """
+    Raised when paying off a debt would take more than the period cap.
+    `debts` holds the offending indices when a whole portfolio is checked.
+    """
+    def __init__(self, max_periods, debts=None):
+        self.max_periods = max_periods
+        self.debts = debts
+        super().__init__(
+            f"This payment would take more than {max_periods} payments to "
+            "pay off the balance")
+
+    def __reduce__(self):
+        return type(self), (self.max_periods, self.debts)
+
+
+def max_schedule_periods(payments_per_year) -> int:
+    """The most payments a schedule may have at the given frequency."""
+    return MAX_SCHEDULE_YEARS * int(payments_per_year)
+
+
+# The cap at the most frequent payments, for callers that don't know the
+# frequency
+MAX_SCHEDULE_PERIODS = max_schedule_periods(max(c.PAYMENTS_PER_YEAR.values()))
+
+
+def check_finite(*terms):
+    """
+    Rejects a balance, interest rate or payment that's infinite or NaN,
+    which no schedule can be built from and which would otherwise fail
+    deep in the arithmetic with an unrelated error.
+    """
+    if not all(math.isfinite(float(term)) for term in terms):
+        raise NonFiniteTermsError()
+
+
+def estimate_periods(balance: float, period_rate: float,
+                     payment_amount: float) -> int:
+    """
+    Estimates the number of payments needed to retire a balance using the
+    annuity formula. The estimate ignores per-period rounding, so the actual
+    schedule can run a period or two longer. Returns 1 when the payment does
+    not cover the first period's interest and no estimate is possible.
+    Raises `NonFiniteTermsError` for terms that aren't finite.
+    """
+    check_finite(balance, period_rate, payment_amount)
+    if balance <= 0 or payment_amount <= 0:
+        return 1
+    if period_rate <= 0:
+        return max(1, math.ceil(balance / payment_amount))
+    coverage = 1 - period_rate * balance / payment_amount
+    if coverage <= 0:
+        return 1
+    return max(1, math.ceil(-math.log(coverage) / math.log1p(period_rate)))
+
+
+def estimate_periods_array(balances, period_rates,
+                           payment_amounts) -> np.ndarray:
+    """
+    `estimate_periods` for arrays of debts, as an int64 array. Raises
+    `NonFiniteTermsError` with the indices of any debts whose terms aren't
+    finite.
+    """
+    balances = np.asarray(balances, dtype=np.float64)
+    period_rates = np.asarray(period_rates, dtype=np.float64)
+    payment_amounts = np.asarray(payment_amounts, dtype=np.float64)
+    nonfinite = ~(np.isfinite(balances) & np.isfinite(period_rates)
+                  & np.isfinite(payment_amounts))
+    if nonfinite.any():
+        raise NonFiniteTermsError(np.flatnonzero(nonfinite).tolist())
+    with np.errstate(divide='ignore', invalid='ignore'):
+        coverage = 1 - period_rates * balances / payment_amounts
+        estimates = np.where(
+            period_rates > 0,
+            np.ceil(-np.log(coverage) / np.log1p(period_rates)),
+            np.ceil(balances / payment_amounts))
+    estimable = (balances > 0) & (payment_amounts > 0) \
+        & ((period_rates <= 0) | (coverage > 0))
+    return np.where(estimable, np.maximum(estimates, 1), 1).astype(np.int64)
+
+
+def check_schedule(balance, first_interest, payment_amount,
+                   estimated_periods, max_periods):
+    """
+    Rejects terms that aren't finite, would never pay off, or would take
+    more than `max_periods` payments to, before any schedule is built. A
+    payment that covers the first period's interest covers every later
+    period's too, since the balance only goes down from there.
+    """
+    check_finite(balance, first_interest, payment_amount)
+    if payment_amount < balance and payment_amount <= first_interest:
+        raise NegativeAmortizationError()
+    if estimated_periods > max_periods:
+        raise ScheduleTooLongError(max_periods)
+
+
+def amortization_arrays(balance: float, period_rate: float,
+                        payment_amount: float,
+                        max_periods: int = MAX_SCHEDULE_PERIODS):
+    """
+    Builds a full amortization schedule as columnar NumPy arrays.
+
+    The schedule matches `base.Amortization.schedule_by_amount` exactly,
+    including rounding interest, principal and balance to the cent every
+    period. Columns are preallocated from the annuity estimate, only grow if
+    rounding pushes the schedule past it and are converted to arrays once at
+    the end, so building a schedule is linear in its length.
+
+    Parameters
+    ----------
+
+    balance: float
+        The starting balance of the debt.
+
+    period_rate: float
+        The interest rate charged each period as a fraction, e.g. 0.05 / 12
+        for a 5% annual rate paid monthly.
+
+    payment_amount: float
+        The payment made each period.
+
+    max_periods: int
+        The most payments the schedule may have. Defaults to
+        `MAX_SCHEDULE_PERIODS`, the cap at the most frequent payments; pass
+        `max_schedule_periods` of the debt's frequency where it's known.
+
+    Returns
+    -------
+
+    tuple of np.ndarray
+        The payment amount, interest, principal and remaining balance for
+        each period, in that order.
+
+    Raises
+    ------
+
+    NonFiniteTermsError
+        If the balance, rate or payment is infinite or NaN.
+
+    NegativeAmortizationError
+        If the payment doesn't cover the interest charged each period.
+
+    ScheduleTooLongError
+        If the schedule would have more than `max_periods` payments.
+    """
+    balance, period_rate = float(balance), float(period_rate)
+    payment_amount = float(payment_amount)
+    estimated_periods = estimate_periods(balance, period_rate, payment_amount)
+    check_schedule(balance, round(balance * period_rate, 2), payment_amount,
+                   estimated_periods, max_periods)
+    capacity = estimated_periods + 2
+    amounts, interests, principals, balances = columns = [
+        [0.0] * capacity for _ in range(4)]
+    period = 0
+    while balance > 0:
+        if period == max_periods:
+            raise ScheduleTooLongError(max_periods)
+        if period == capacity:
+            for column in columns:
+                column.extend([0.0] * capacity)
+            capacity *= 2
+        interest = round(balance * period_rate, 2)
+        if payment_amount < balance:
+            amount = payment_amount
+            principal = round(payment_amount - interest, 2)
+            balance = round(balance - principal, 2)
+        else:
+            principal, amount, balance = balance, balance + interest, 0
+        amounts[period] = amount
+        interests[period] = interest
+        principals[period] = principal
+        balances[period] = balance
+        period += 1
+    return tuple(
+        np.array(column[:period], dtype=np.float64) for column in columns)
+
+
+# Interest rates are held as integer millionths of a percent in cents mode
+RATE_SCALE = 1_000_000
+
+ROUNDING_MODES = ('half_even', 'half_up')
+
+
+def to_cents(amount: float) -> int:
+    """Converts a dollar amount to a whole number of cents."""
+    return int(round(float(amount) * 100))
+
+
+def divide_rounded(numerator: int, denominator: int, rounding: str) -> int:
+    """
+    Divides two non-negative integers, rounding the quotient to the nearest
+    integer. Exact halves go to the even neighbour under 'half_even' and up
+    under 'half_up'.
+    """
+    quotient, remainder = divmod(numerator, denominator)
+    twice_remainder = 2 * remainder
+    if twice_remainder > denominator:
+        return quotient + 1
+    if twice_remainder == denominator:
+        if rounding == 'half_up' or quotient % 2:
+            return quotient + 1
+    return quotient
+
+
+def amortization_cents(balance: float, interest_rate: float,
+                       payments_per_year: int, payment_amount: float,
+                       rounding: str = 'half_even',
+                       max_periods: int = None):
+    """
+    Builds an amortization schedule in whole cents using only integer
+    arithmetic.
+
+    The balance and payment are converted to cents and the annual rate to
+    an integer number of `RATE_SCALE` units, so each period's interest is an
+    exact fraction that is rounded to the cent by `rounding`. The result
+    doesn't depend on float rounding, and is the same on every platform.
+    Otherwise the schedule follows `amortization_arrays`.
+
+    Parameters
+    ----------
+
+    balance: float
+        The starting balance of the debt in dollars.
+
+    interest_rate: float
+        The annual interest rate as a percentage.
+
+    payments_per_year: int
+        How many payments are made each year.
+
+    payment_amount: float
+        The payment made each period in dollars.
+
+    rounding: {'half_even', 'half_up'}
+        How interest that falls exactly on a half cent is rounded.
+
+    max_periods: int, optional
+        The most payments the schedule may have. Defaults to
+        `max_schedule_periods(payments_per_year)`.
+
+    Returns
+    -------
+
+    tuple of np.ndarray
+        The payment amount, interest, principal and remaining balance for
+        each period in cents, as int64 arrays.
+
+    Raises
+    ------
+
+    NonFiniteTermsError, NegativeAmortizationError, ScheduleTooLongError
+        As for `amortization_arrays`.
+    """
+    if rounding not in ROUNDING_MODES:
+        raise ValueError(f"Unsupported rounding: {rounding}")
+    if max_periods is None:
+        max_periods = max_schedule_periods(payments_per_year)
+    check_finite(balance, interest_rate, payment_amount)
+    balance = to_cents(balance)
+    payment = to_cents(payment_amount)
+    rate_units = int(round(float(interest_rate) * RATE_SCALE))
+    # cents * rate_units / denominator is the interest in cents
+    denominator = 100 * RATE_SCALE * int(payments_per_year)
+    estimated_periods = estimate_periods(
+        balance, rate_units / denominator, payment)
+    check_schedule(
+        balance, divide_rounded(balance * rate_units, denominator, rounding),
+        payment, estimated_periods, max_periods)
+    capacity = estimated_periods + 2
+    amounts, interests, principals, balances = columns = [
+        [0] * capacity for _ in range(4)]
+    period = 0
+    while balance > 0:
+        if period == max_periods:
+            raise ScheduleTooLongError(max_periods)
+        if period == capacity:
+            for column in columns:
+                column.extend([0] * capacity)
+            capacity *= 2
+        interest = divide_rounded(balance * rate_units, denominator, rounding)
+        if payment < balance:
+            amount = payment
+            principal = payment - interest
+            balance -= principal
+        else:
+            principal, amount, balance = balance, balance + interest, 0
+        amounts[period] = amount
+        interests[period] = interest
+        principals[period] = principal
+        balances[period] = balance
+        period += 1
+    return tuple(
+        np.array(column[:period], dtype=np.int64) for column in columns)
+
+
+def round_cents(values: np.ndarray) -> np.ndarray:
+    """
+    Rounds an array to the cent exactly as the built-in `round(x, 2)` does.
+
+    `np.round` scales by 100 before rounding, which can push a value sitting
+    next to a half cent over the boundary. Values that land that close to a
+    tie are rounded one at a time with `round`; everything else is already
+    unambiguous after scaling.
+    """
+    scaled = values * 100
+    cents = np.rint(scaled)
+    rounded = cents / 100
+    if not len(scaled):
+        return rounded
+    tie_distance = np.abs(np.abs(scaled - cents) - 0.5)
+    tolerance = 1e-12 * np.abs(scaled).max() + 1e-9
+    if tie_distance.min() <= tolerance:
+        for i in np.flatnonzero(tie_distance <= tolerance):
+            rounded[i] = round(float(values[i]), 2)
+    return rounded
+
+
+def snap_cents(values: np.ndarray) -> np.ndarray:
+    """
+    Rounds values that are already within a float rounding error of a whole
+    cent, such as the difference of two cent amounts, to that cent. Such
+    values can't sit next to a half cent, so this gives the same result as
+    `round_cents` without checking for ties. Amounts that may come from
+    user input, which can have more than two decimals, need `round_cents`.
+    """
+    return np.rint(values * 100) / 100
+
+
+# Below this many debts carrying a balance in an average step, i.e. the
+# portfolio's rows over its longest schedule, stepping the portfolio as
+# arrays costs more in per-step NumPy overhead than it saves
+BATCH_STEP_MIN_DEBTS = 20
+
+
+class BatchAmortization():
+    """
+    Amortization schedules for many debts stored back to back in flat
+    columns. The rows for debt `i` are `offsets[i]:offsets[i + 1]` in each
+    column.
+    """
+    def __init__(self, periods, amounts, interests, principals, balances):
+        self.periods = periods
+        self.offsets = np.concatenate(([0], np.cumsum(periods)))
+        self.amounts = amounts
+        self.interests = interests
+        self.principals = principals
+        self.balances = balances
+        starts = self.offsets[:-1]
+        has_rows = periods > 0
+        self.total_interest = np.zeros(len(periods))
+        self.total_paid = np.zeros(len(periods))
+        self.total_interest[has_rows] = np.add.reduceat(
+            interests, starts[has_rows])
+        self.total_paid[has_rows] = np.add.reduceat(
+            amounts, starts[has_rows])
+
+    def __len__(self):
+        return len(self.periods)
+
+    def schedule(self, debt: int):
+        """
+        Returns the payment amount, interest, principal and remaining balance
+        arrays for a single debt, as views into the flat columns.
+        """
+        rows = slice(self.offsets[debt], self.offsets[debt + 1])
+        return (self.amounts[rows], self.interests[rows],
+                self.principals[rows], self.balances[rows])
+
+
+def batch_amortization(balances, interest_rates, payment_amounts,
+                       payment_frequencies,
+                       max_years: int = MAX_SCHEDULE_YEARS
+                       ) -> BatchAmortization:
+    """
+    Computes the amortization schedules of a whole portfolio at once.
+
+    All debts advance one period per step, with the state of every debt
+    still carrying a balance held in parallel arrays, so the Python-level
+    work per step is the same whether there are two debts or two thousand.
+    Portfolios with fewer than `BATCH_STEP_MIN_DEBTS` debts to a step, on
+    average, don't amortize that fixed cost and are run through
+    `amortization_arrays` one debt at a time instead. Either way, each schedule matches `amortization_arrays` for the
+    same debt exactly, including balances and payments that aren't whole
+    cents.
+
+    Parameters
+    ----------
+
+    balances: array-like of float
+        The starting balance of each debt.
+
+    interest_rates: array-like of float
+        The annual interest rate of each debt as a percentage, as stored on
+        `base.Debt.interest_rate`.
+
+    payment_amounts: array-like of float
+        The payment made on each debt every period.
+
+    payment_frequencies: array-like of str
+        The payment frequency of each debt; one of
+        `constants.PAYMENT_FREQUENCY_OPTIONS`.
+
+    max_years: int
+        The most years any one schedule may run, which caps each debt at
+        `max_years` times its payments per year.
+
+    Returns
+    -------
+
+    BatchAmortization
+        The schedules of all debts plus per-debt period counts and totals.
+
+    Raises
+    ------
+
+    NonFiniteTermsError, NegativeAmortizationError, ScheduleTooLongError
+        If any debt's terms are rejected, with the indices of the offending
+        debts in `debts`. All are checked for the whole portfolio before
+        any schedule is built, and `ScheduleTooLongError` carries the cap of
+        the first offending debt.
+    """
+    balance = np.array(balances, dtype=np.float64)
+    payment = np.array(payment_amounts, dtype=np.float64)
+    payments_per_year = np.array(
+        [c.PAYMENTS_PER_YEAR[frequency.capitalize()]
+         for frequency in payment_frequencies], dtype=np.float64)
+    period_rate = 0.01 * np.array(interest_rates, dtype=np.float64) \
+        / payments_per_year
+    # Rejects non-finite terms before anything else reads them
+    estimated_periods = estimate_periods_array(balance, period_rate, payment)
+    nonconvergent = (payment < balance) \
+        & (payment <= round_cents(balance * period_rate))
+    if nonconvergent.any():
+        raise NegativeAmortizationError(np.flatnonzero(nonconvergent).tolist())
+    max_periods = max_years * payments_per_year.astype(np.int64)
+
+    def too_long(debts):
+        return ScheduleTooLongError(
+            int(max_periods[debts[0]]), [int(debt) for debt in debts])
+
+    too_many = np.flatnonzero(estimated_periods > max_periods)
+    if len(too_many):
+        raise too_long(too_many)
+
+    if (not len(balance) or estimated_periods.sum()
+            < BATCH_STEP_MIN_DEBTS * estimated_periods.max()):
+        schedules = []
+        for debt, terms in enumerate(zip(balance, period_rate, payment)):
+            try:
+                schedules.append(
+                    amortization_arrays(*terms, int(max_periods[debt])))
+            except ScheduleTooLongError:
+                raise too_long([debt])
+        periods = np.array(
+            [len(schedule[0]) for schedule in schedules], dtype=np.int64)
+        columns = [
+            np.concatenate([schedule[k] for schedule in schedules])
+            if schedules else np.empty(0) for k in range(4)]
+        return BatchAmortization(periods, *columns)
+
+    # Balances and payments can have more than two decimals. Differences of
+    # whole cents only need snapping to the cent, which every balance is
+    # after the first step, and every payment may be from the start.
+    round_principal = (
+        snap_cents if np.array_equal(snap_cents(payment), payment)
+        else round_cents)
+    # Rounding can still carry a schedule a period or two past its estimate
+    shortest_cap = max_periods.min() if len(max_periods) else 0
+    steps = []
+    active = np.flatnonzero(balance > 0)
+    while len(active):
+        if len(steps) >= shortest_cap:
+            capped = active[max_periods[active] <= len(steps)]
+            if len(capped):
+                raise too_long(capped)
+        round_balance = snap_cents if steps else round_cents
+        current = balance[active]
+        rate = period_rate[active]
+        pay = payment[active]
+        interest = round_cents(current * rate)
+        final = pay >= current
+        principal = np.where(final, current, round_principal(pay - interest))
+        amount = np.where(final, current + interest, pay)
+        remaining = np.where(final, 0.0, round_balance(current - principal))
+        balance[active] = remaining
+        steps.append((active, amount, interest, principal, remaining))
+        active = active[remaining > 0]
+
+    periods = np.zeros(len(balance), dtype=np.int64)
+    for step_active, *_ in steps:
+        periods[step_active] += 1
+    offsets = np.concatenate(([0], np.cumsum(periods)))[:-1]
+    total_rows = int(periods.sum())
+    columns = [np.empty(total_rows) for _ in range(4)]
+    for step, (step_active, *values) in enumerate(steps):
+        rows = offsets[step_active] + step
+        for column, value in zip(columns, values):
+            column[rows] = value
+    return BatchAmortization(periods, *columns)
+
+
+# The most rounding each period's interest to the cent moves the balance
+# off the closed form. The principal and balance are whole cents once the
+# interest is, so they add nothing.
+ROUNDING_ERROR_PER_PERIOD = 0.005
+
+
+class PayoffSummary():
+    """
+    The headline numbers of an amortization schedule.
+
+    Attributes
+    ----------
+
+    periods: int
+        The number of payments it takes to pay off the debt.
+
+    final_payment: float
+        The amount of the last payment.
+
+    total_interest: float
+        The total interest paid over the life of the debt. An estimate
+        unless `exact`.
+
+    interest_tolerance: float
+        The most `total_interest` and `final_payment` can be off the
+        schedule's. 0 when the summary came from the cent-rounded
+        recurrence, and they're exact.
+
+    payoff_date: str or None
+        The date of the last payment as 'YYYY-MM-DD', if known.
+    """
+    def __init__(self, periods, final_payment, total_interest,
+                 interest_tolerance, payoff_date=None):
+        self.periods = periods
+        self.final_payment = final_payment
+        self.total_interest = total_interest
+        self.interest_tolerance = interest_tolerance
+        self.payoff_date = payoff_date
+
+    @property
+    def exact(self):
+        return self.interest_tolerance == 0
+
+
+def _exact_payoff(balance, period_rate, payment_amount, max_periods):
+    """
+    Runs the cent-rounded recurrence without storing any rows and returns
+    the period count, final payment and total interest.
+    """
+    periods = 0
+    total_interest = 0.0
+    amount = 0.0
+    while balance > 0:
+        if periods == max_periods:
+            raise ScheduleTooLongError(max_periods)
+        periods += 1
+        interest = round(balance * period_rate, 2)
+        total_interest += interest
+        if payment_amount < balance:
+            balance = round(balance - round(payment_amount - interest, 2), 2)
+        else:
+            amount, balance = balance + interest, 0
+    return periods, amount, round(total_interest, 2)
+
+
+def payoff_summary(balance: float, period_rate: float, payment_amount: float,
+                   exact: bool = False,
+                   max_periods: int = MAX_SCHEDULE_PERIODS) -> PayoffSummary:
+    """
+    Summarizes a debt's payoff without building its schedule.
+
+    The annuity formula gives the balance after any number of periods in
+    constant time. Each period's rounding to the cent moves the real balance
+    off it by at most `ROUNDING_ERROR_PER_PERIOD`, and later interest
+    compounds what's already accumulated, so after k periods the two are
+    at most that much times the sum of (1 + rate)^j for j below k apart.
+    When the closed-form balance is clear of both payoff boundaries by that
+    bound, the period count, and so the payoff date, is the schedule's. The
+    final payment and total interest then come from a one-period pass from
+    the closed-form balance, and are estimates within `interest_tolerance`
+    of the schedule's.
+
+    When the bound can't prove the count, e.g. when the last payment is
+    within a few dollars of zero or of a full payment, or `exact` is True,
+    the cent-rounded recurrence is run instead, without storing any rows,
+    and every number matches the schedule.
+
+    Raises
+    ------
+
+    NonFiniteTermsError, NegativeAmortizationError, ScheduleTooLongError
+        As for `amortization_arrays`.
+    """
+    balance, period_rate = float(balance), float(period_rate)
+    payment_amount = float(payment_amount)
+    check_finite(balance, period_rate, payment_amount)
+    if balance <= 0:
+        return PayoffSummary(0, 0.0, 0.0, 0.0)
+    if payment_amount >= balance:
+        interest = round(balance * period_rate, 2)
+        return PayoffSummary(1, balance + interest, interest, 0.0)
+    check_schedule(
+        balance, round(balance * period_rate, 2), payment_amount,
+        estimate_periods(balance, period_rate, payment_amount), max_periods)
+    # Every payment but the last pays off its principal rounded to the cent,
+    # so the balance follows the closed form for the payment rounded to the
+    # cent, while the payment itself decides which period is the last. A
+    # payment on a half cent can round either way from period to period.
+    principal_payment = round(payment_amount, 2)
+    sub_cent = payment_amount * 100 - math.floor(payment_amount * 100)
+    if (exact or abs(sub_cent - 0.5) < 1e-6
+            or principal_payment <= balance * period_rate):
+        return PayoffSummary(*_exact_payoff(
+            balance, period_rate, payment_amount, max_periods), 0.0)
+
+    if period_rate > 0:
+        growth = math.log1p(period_rate)
+        annuity = principal_payment / period_rate
+
+        def closed_form_balance(k):
+            return annuity - (annuity - balance) * math.exp(k * growth)
+
+        def rounding_drift(k):
+            return ROUNDING_ERROR_PER_PERIOD * math.expm1(
+                k * growth) / period_rate
+
+        last_balance_index = max(1, math.ceil(math.log(
+            (principal_payment - payment_amount * period_rate)
+            / (principal_payment - balance * period_rate)) / growth))
+    else:
+        def closed_form_balance(k):
+            return balance - k * principal_payment
+
+        def rounding_drift(k):
+            return ROUNDING_ERROR_PER_PERIOD * k
+
+        last_balance_index = max(1, math.ceil(
+            (balance - payment_amount) / principal_payment))
+
+    # Period `last_balance_index + 1` is the final payment if the balance
+    # before it is within one payment and the balance a period earlier isn't
+    k = last_balance_index
+    margin = 1e-6
+    confirmed = (
+        closed_form_balance(k) + rounding_drift(k) <= payment_amount - margin
+        and closed_form_balance(k - 1) - rounding_drift(k - 1)
+        > payment_amount + margin)
+    if not confirmed:
+        return PayoffSummary(*_exact_payoff(
+            balance, period_rate, payment_amount, max_periods), 0.0)
+    if k + 1 > max_periods:
+        raise ScheduleTooLongError(max_periods)
+
+    last_balance = round(closed_form_balance(k), 2)
+    final_payment = last_balance + round(last_balance * period_rate, 2)
+    total_interest = round(
+        k * principal_payment + final_payment - balance, 2)
+    # The closed-form balance is off by up to the drift, and rounding it and
+    # its interest to the cent adds up to a cent more
+    interest_tolerance = math.ceil(
+        100 * (rounding_drift(k) * (1 + period_rate) + 0.02)) / 100
+    return PayoffSummary(
+        k + 1, final_payment, total_interest, interest_tolerance)
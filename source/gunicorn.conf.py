@@ -0,0 +1,86 @@
+"""
+gunicorn settings for serving the app in production, with
+`gunicorn --config source/gunicorn.conf.py`.
+
+Generating schedules and building figures is CPU-bound, so threads in one
+process mostly wait on each other for the GIL. Instead the app is served by
+one worker process per CPU, each with a few threads for requests that wait
+on I/O. The app is imported once, before the workers are forked, so they
+share its memory copy-on-write and start without importing it again.
+"""
+
+import gc
+import math
+import os
+from source.config import WARM_UP, WORKERS, WORKER_THREADS
+
+
+def available_cpus():
+    """
+    The CPUs this process may run on, limited by the container's CPU quota
+    when it has one, as on Cloud Run.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as cpu_max:
+            quota, period = cpu_max.read().split()
+    except (OSError, ValueError):
+        return cpus
+    if quota == 'max':
+        return cpus
+    return max(1, min(cpus, math.ceil(int(quota) / int(period))))
+
+
+wsgi_app = 'source.app:server'
+bind = f":{os.environ.get('PORT', '8080')}"
+workers = WORKERS or available_cpus()
+threads = WORKER_THREADS
+worker_class = 'gthread'
+timeout = 0
+preload_app = True
+
+
+def when_ready(server):
+    """
+    Runs in the master once the app is imported, and warmed up if
+    `WARM_UP` is set, just before the workers are forked.
+    """
+    from source import background
+    from source import session_store as ss
+    if ss.session_store is not None:
+        ss.session_store.close()
+    background.close()
+    # Move everything imported so far out of the garbage collector's reach,
+    # so collections in the workers don't write to, and so copy, the pages
+    # they share with the master
+    gc.freeze()
+    server.log.info(
+        "Serving with %s workers of %s threads%s", workers, threads,
+        ", warmed up" if WARM_UP else "")
+
+
+def post_fork(server, worker):
+    """
+    Runs in each worker as it starts, giving it its own copy of everything
+    that's kept per process rather than what the master left behind.
+    """
+    from source import cache
+    from source import instrumentation
+    from source import offload
+    cache.amortization_cache.clear()
+    instrumentation.callback_metrics.clear()
+    instrumentation.operation_metrics.clear()
+    instrumentation.requests_in_flight.clear()
+    # The session store reopens its connections in any forked process
+    offload.compute_pool.reset()
+    if WARM_UP:
+        offload.compute_pool.start()
+
+
+def worker_exit(server, worker):
+    """Stops the worker's offload pool along with it."""
+    from source import offload
+    offload.compute_pool.shutdown()
@@ -0,0 +1,320 @@
+"""
+Per-callback latency and payload instrumentation.
+
+Each request is timed from start to finish and each callback's own run
+time is measured apart from the work Dash does around it, so a request
+breaks down into
+
+- parse: reading the request and preparing the callback's arguments,
+- callback: running the callback, including any `phase` inside it,
+- serialize: turning its outputs into the JSON response.
+
+The breakdown is sent back in a `Server-Timing` header, which the
+browser's developer tools show for every request, and every callback's
+latency and request and response sizes are accumulated into histograms
+that are logged as structured JSON.
+"""
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+import logging
+import threading
+import time
+import flask
+from source.config import INSTRUMENTATION_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds of the payload size histogram buckets, in bytes
+SIZE_BUCKETS = (
+    1_024, 4_096, 16_384, 65_536, 262_144, 1_048_576, 4_194_304)
+
+
+class Histogram():
+    """Counts observations into buckets with fixed upper bounds."""
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # One count per bucket, plus one for values above the last bound
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        return {
+            'buckets': list(self.buckets),
+            'counts': list(self.counts),
+            'count': self.count,
+            'sum': self.sum
+        }
+
+
+class CallbackMetrics():
+    """Latency and payload size histograms for each callback, thread-safe."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callbacks = {}
+
+    def observe(self, callback, seconds, request_bytes, response_bytes):
+        """Records one request, returning the callback's request count."""
+        with self._lock:
+            histograms = self._callbacks.get(callback)
+            if histograms is None:
+                histograms = self._callbacks[callback] = {
+                    'latency_seconds': Histogram(LATENCY_BUCKETS),
+                    'request_bytes': Histogram(SIZE_BUCKETS),
+                    'response_bytes': Histogram(SIZE_BUCKETS)
+                }
+            histograms['latency_seconds'].observe(seconds)
+            histograms['request_bytes'].observe(request_bytes)
+            histograms['response_bytes'].observe(response_bytes)
+            return histograms['latency_seconds'].count
+
+    def snapshot(self, callback=None):
+        """
+        Returns the histograms of every callback keyed by callback name, or
+        of just `callback`.
+        """
+        with self._lock:
+            return {
+                name: {
+                    metric: histogram.snapshot()
+                    for metric, histogram in histograms.items()}
+                for name, histograms in self._callbacks.items()
+                if callback is None or name == callback}
+
+    def clear(self):
+        with self._lock:
+            self._callbacks.clear()
+
+
+class OperationMetrics():
+    """
+    Latency histograms and error counts for named operations done outside
+    of any one callback, e.g. generating schedules, thread-safe.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._errors = {}
+
+    @contextmanager
+    def time(self, operation):
+        """Times a block of code as one run of `operation`."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            with self._lock:
+                self._errors[operation] = self._errors.get(operation, 0) + 1
+            raise
+        seconds = time.perf_counter() - start
+        with self._lock:
+            histogram = self._latencies.get(operation)
+            if histogram is None:
+                histogram = self._latencies[operation] = Histogram(
+                    LATENCY_BUCKETS)
+            histogram.observe(seconds)
+
+    def snapshot(self):
+        """Returns each operation's latency histogram and error count."""
+        with self._lock:
+            return {
+                operation: {
+                    'latency_seconds': (
+                        self._latencies[operation].snapshot()
+                        if operation in self._latencies
+                        else Histogram(LATENCY_BUCKETS).snapshot()),
+                    'errors': self._errors.get(operation, 0)
+                }
+                for operation in {*self._latencies, *self._errors}}
+
+    def merge(self, snapshot):
+        """
+        Adds the runs in a `snapshot` taken in another process, e.g. a
+        background callback's job, to these metrics.
+        """
+        with self._lock:
+            for operation, metrics in snapshot.items():
+                latencies = metrics['latency_seconds']
+                if latencies['count']:
+                    histogram = self._latencies.get(operation)
+                    if histogram is None:
+                        histogram = self._latencies[operation] = Histogram(
+                            LATENCY_BUCKETS)
+                    histogram.counts = [
+                        count + added for count, added
+                        in zip(histogram.counts, latencies['counts'])]
+                    histogram.count += latencies['count']
+                    histogram.sum += latencies['sum']
+                if metrics['errors']:
+                    self._errors[operation] = (
+                        self._errors.get(operation, 0) + metrics['errors'])
+
+    def clear(self):
+        with self._lock:
+            self._latencies.clear()
+            self._errors.clear()
+
+
+class RequestsInFlight():
+    """Counts the requests a worker is handling at once, thread-safe."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+
+    def start(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def finish(self):
+        with self._lock:
+            self.current -= 1
+
+    def snapshot(self):
+        with self._lock:
+            return {'current': self.current, 'peak': self.peak}
+
+    def clear(self):
+        with self._lock:
+            self.current = self.peak = 0
+
+
+# Shared by every thread in the worker process
+callback_metrics = CallbackMetrics()
+operation_metrics = OperationMetrics()
+requests_in_flight = RequestsInFlight()
+
+
+def _timings():
+    """The current request's timings, or None outside a timed request."""
+    if not flask.has_request_context():
+        return None
+    return flask.g.get('timings')
+
+
+@contextmanager
+def phase(name):
+    """
+    Times a block of code as a named phase of the current request. Outside
+    a request, or with instrumentation disabled, it does nothing.
+    """
+    timings = _timings()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases = timings['phases']
+        phases[name] = phases.get(name, 0.0) + time.perf_counter() - start
+
+
+def timed_callback(func):
+    """Wraps a callback function to time its run within the request."""
+    @wraps(func)
+    def timed(*args, **kwargs):
+        timings = _timings()
+        if timings is None:
+            return func(*args, **kwargs)
+        timings['callback'] = func.__name__
+        timings['callback_start'] = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings['callback_end'] = time.perf_counter()
+    return timed
+
+
+def instrument_callbacks(app):
+    """
+    Makes every callback registered on `app` from now on time itself with
+    `timed_callback`. Clientside callbacks run in the browser and aren't
+    affected.
+    """
+    register_callback = app.callback
+
+    @wraps(register_callback)
+    def callback(*args, **kwargs):
+        decorator = register_callback(*args, **kwargs)
+        return lambda func: decorator(timed_callback(func))
+
+    app.callback = callback
+
+
+def start_request():
+    """Starts timing the current request."""
+    requests_in_flight.start()
+    flask.g.timings = {'start': time.perf_counter(), 'phases': {}}
+
+
+def teardown_request(exception=None):
+    """Stops counting the current request as in flight, even if it failed."""
+    if flask.g.pop('timings', None) is not None:
+        requests_in_flight.finish()
+
+
+def server_timing(timings, end):
+    """
+    Returns the Server-Timing header value for a request's timings, in
+    milliseconds.
+    """
+    durations = {}
+    if 'callback_start' in timings:
+        durations['parse'] = timings['callback_start'] - timings['start']
+        durations['callback'] = (
+            timings['callback_end'] - timings['callback_start'])
+        durations.update(timings['phases'])
+        durations['serialize'] = end - timings['callback_end']
+    else:
+        durations.update(timings['phases'])
+    durations['total'] = end - timings['start']
+    return ', '.join(
+        f'{name};dur={seconds * 1000:.2f}'
+        for name, seconds in durations.items())
+
+
+def finish_request(response):
+    """
+    Adds the Server-Timing header to a response and, for callback requests,
+    records the callback's latency and payload sizes.
+    """
+    timings = _timings()
+    if timings is None:
+        return response
+    end = time.perf_counter()
+    response.headers['Server-Timing'] = server_timing(timings, end)
+
+    callback = timings.get('callback')
+    if callback is None:
+        return response
+    request_bytes = flask.request.content_length or 0
+    response_bytes = response.calculate_content_length() or 0
+    count = callback_metrics.observe(
+        callback, end - timings['start'], request_bytes, response_bytes)
+    log_every = INSTRUMENTATION_CONFIG['log_every']
+    if log_every and count % log_every == 0:
+        log_metrics(callback)
+    return response
+
+
+def log_metrics(callback=None):
+    """
+    Logs the histograms of every callback, or of just `callback`, at INFO,
+    one structured record per callback.
+    """
+    for name, histograms in callback_metrics.snapshot(callback).items():
+        logger.info('Callback metrics for %s', name,
+                    extra={'fields': {'callback': name, **histograms}})
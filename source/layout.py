@@ -9,6 +9,7 @@ from source.components.ui_components import (
     create_debt_details_view_content,
     create_plan_details_view_content,
     create_graph_view_content,
+    create_visualizations_progress,
     create_amortization_view_content
 )
 
@@ -52,6 +53,7 @@ def create_main_tabs():
                     value="plans"
                     ),
             ],
+            id="main_tabs",
             value="debt_details"
         ), 
         span={'base': 12, 'md': 3}
@@ -63,7 +65,8 @@ def create_visualization_tabs():
     graph_view_content = create_graph_view_content()
     amortization_view_content = create_amortization_view_content()
     
-    return dmc.GridCol(
+    return dmc.GridCol([
+        create_visualizations_progress(),
         dmc.Tabs(
             [
                 dmc.TabsList([
@@ -79,8 +82,9 @@ def create_visualization_tabs():
                     value="table_view"
                     ),
             ],
+            id="visualization_tabs",
             value="graph_view"
-        ),
+        )],
         span={'base': 12, 'md': 9}
     )
 
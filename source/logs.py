@@ -0,0 +1,46 @@
+"""
+Structured logging for the app's own messages.
+
+Every module logs through `logging.getLogger(__name__)`, under the `source`
+logger. `configure_logging` writes those records to stdout as one JSON
+object per line, with the `severity` and `message` fields Cloud Logging
+reads and any fields passed as `extra={'fields': {...}}`, so they can be
+filtered by level or silenced with `LOG_LEVEL` like any other log.
+"""
+
+import json
+import logging
+import sys
+from source.config import LOG_LEVEL
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as a single line of JSON."""
+    def format(self, record):
+        entry = {
+            'severity': record.levelname,
+            'message': record.getMessage(),
+            'logger': record.name,
+            **getattr(record, 'fields', {})
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+def configure_logging(level=LOG_LEVEL):
+    """
+    Sends the `source` logger's records to stdout as JSON at `level`. Safe
+    to call more than once.
+    """
+    logger = logging.getLogger('source')
+    if not any(getattr(handler, 'juggle', False)
+               for handler in logger.handlers):
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(JsonFormatter())
+        handler.juggle = True
+        logger.addHandler(handler)
+    logger.setLevel(level)
+    # gunicorn's and Flask's handlers would write the records a second time
+    logger.propagate = False
+    return logger
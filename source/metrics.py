@@ -0,0 +1,171 @@
+"""
+Worker metrics in the Prometheus text exposition format.
+
+Each gunicorn worker keeps its own metrics, and a scrape is answered by
+whichever worker accepts it, so every series carries a `worker` label with
+the worker's process ID. Prometheus then tracks each worker's counters on
+their own, rather than seeing them jump between workers as false resets,
+and they can be summed across workers with `sum without (worker)`.
+"""
+
+import hmac
+import os
+import flask
+from source import background
+from source import cache
+from source import instrumentation
+from source import session_store as ss
+from source.config import METRICS_CONFIG, WORKER_THREADS
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return (str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsWriter():
+    """
+    Accumulates metric families and renders them as exposition text, with
+    `const_labels` added to every sample.
+    """
+    def __init__(self, const_labels=None):
+        self._lines = []
+        self._declared = set()
+        self.const_labels = const_labels or {}
+
+    def _declare(self, name, metric_type, help_text):
+        if name not in self._declared:
+            self._declared.add(name)
+            self._lines.append(f'# HELP {name} {help_text}')
+            self._lines.append(f'# TYPE {name} {metric_type}')
+
+    def sample(self, name, metric_type, help_text, value, labels=None):
+        """Adds one sample of a counter or gauge."""
+        self._declare(name, metric_type, help_text)
+        labels = {**self.const_labels, **(labels or {})}
+        self._lines.append(f'{name}{_labels(labels)} {_value(value)}')
+
+    def histogram(self, name, help_text, snapshot, labels=None):
+        """
+        Adds a histogram from an `instrumentation.Histogram` snapshot, whose
+        per-bucket counts become Prometheus' cumulative buckets.
+        """
+        self._declare(name, 'histogram', help_text)
+        labels = {**self.const_labels, **(labels or {})}
+        cumulative = 0
+        bounds = [*snapshot['buckets'], float('inf')]
+        for bound, count in zip(bounds, snapshot['counts']):
+            cumulative += count
+            self._lines.append(
+                f'{name}_bucket{_labels({**labels, "le": _value(bound)})} '
+                f'{cumulative}')
+        self._lines.append(f'{name}_sum{_labels(labels)} '
+                           f'{_value(float(snapshot["sum"]))}')
+        self._lines.append(f'{name}_count{_labels(labels)} '
+                           f'{snapshot["count"]}')
+
+    def render(self):
+        return '\n'.join(self._lines) + '\n'
+
+
+def render_metrics():
+    """Returns every metric of this worker as exposition text."""
+    writer = MetricsWriter(const_labels={'worker': str(os.getpid())})
+    background.collect_job_metrics()
+
+    operations = instrumentation.operation_metrics.snapshot()
+    for operation, metrics in operations.items():
+        labels = {'operation': operation}
+        writer.histogram(
+            'juggle_operation_duration_seconds',
+            'Time taken by operations such as schedule generation.',
+            metrics['latency_seconds'], labels)
+        writer.sample(
+            'juggle_operation_errors_total', 'counter',
+            'Operations that raised an error.', metrics['errors'], labels)
+
+    callbacks = instrumentation.callback_metrics.snapshot()
+    for callback, metrics in callbacks.items():
+        labels = {'callback': callback}
+        writer.histogram(
+            'juggle_callback_duration_seconds',
+            'Time taken by each callback request, start to finish.',
+            metrics['latency_seconds'], labels)
+        writer.histogram(
+            'juggle_callback_request_bytes',
+            'Size of each callback request, including uploaded stores.',
+            metrics['request_bytes'], labels)
+        writer.histogram(
+            'juggle_callback_response_bytes',
+            'Size of each callback response.',
+            metrics['response_bytes'], labels)
+
+    stats = cache.amortization_cache.stats()
+    labels = {'cache': 'amortization'}
+    for key, metric_type, help_text in (
+            ('hits', 'counter', 'Cache lookups that found a value.'),
+            ('misses', 'counter', "Cache lookups that didn't find a value."),
+            ('evictions', 'counter', 'Values evicted to stay within limits.'),
+            ('entries', 'gauge', 'Values currently cached.'),
+            ('bytes', 'gauge', 'Approximate bytes currently cached.'),
+            ('hit_ratio', 'gauge', 'Hits as a share of all lookups.')):
+        name = f'juggle_cache_{key}'
+        if metric_type == 'counter':
+            name += '_total'
+        writer.sample(name, metric_type, help_text, stats[key], labels)
+
+    in_flight = instrumentation.requests_in_flight.snapshot()
+    writer.sample(
+        'juggle_worker_threads', 'gauge',
+        'Threads the worker serves requests with.', WORKER_THREADS)
+    writer.sample(
+        'juggle_requests_in_flight', 'gauge',
+        'Requests the worker is handling right now.', in_flight['current'])
+    writer.sample(
+        'juggle_requests_in_flight_peak', 'gauge',
+        'Most requests the worker has handled at once.', in_flight['peak'])
+    writer.sample(
+        'juggle_thread_saturation_ratio', 'gauge',
+        'Requests in flight as a share of worker threads.',
+        in_flight['current'] / WORKER_THREADS if WORKER_THREADS else 0.0)
+
+    if ss.session_store is not None:
+        session_stats = ss.session_store.stats()
+        writer.sample(
+            'juggle_sessions', 'gauge', 'Live sessions in the session store.',
+            session_stats['sessions'])
+        writer.sample(
+            'juggle_session_store_bytes', 'gauge',
+            'Bytes held by live sessions in the session store.',
+            session_stats['bytes'])
+    return writer.render()
+
+
+def metrics_response():
+    """
+    The Flask response for the /metrics endpoint: the metrics, or 404 if
+    it's disabled or has no token and 401 if the scraper didn't send it.
+    """
+    token = METRICS_CONFIG['token']
+    if not METRICS_CONFIG['enabled'] or not token:
+        flask.abort(404)
+    if not hmac.compare_digest(
+            flask.request.headers.get('Authorization', ''),
+            f'Bearer {token}'):
+        flask.abort(401)
+    return flask.Response(render_metrics(), content_type=CONTENT_TYPE)
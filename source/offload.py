@@ -0,0 +1,183 @@
+"""
+Runs CPU-heavy work, such as long amortization schedules and payoff plans,
+in a shared pool of worker processes.
+
+Work done in the request thread holds the GIL while it runs, so every other
+thread of the worker, including ones serving quick UI callbacks, waits on
+it. Work sent to the pool runs in another process instead, and the request
+thread only waits for its result.
+
+The pool is bounded: it runs at most `max_pending` tasks at once, and each
+task has `timeout_seconds` to finish. When the pool is disabled, full or
+broken, the work runs in the calling thread, so offloading never makes a
+request fail that would have succeeded inline. Functions and arguments
+sent to the pool must be picklable, e.g. module-level functions and
+`base.Amortization` objects.
+"""
+
+import asyncio
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import os
+import threading
+from source.config import OFFLOAD_CONFIG
+
+
+class ComputeTimeoutError(TimeoutError):
+    """Raised when offloaded work doesn't finish within its time limit."""
+    def __init__(self, timeout_seconds):
+        super().__init__(
+            "This took too long to calculate; try a larger payment")
+        self.timeout_seconds = timeout_seconds
+
+
+class ComputePool():
+    """
+    A bounded `ProcessPoolExecutor`, started on first use and shared by
+    every thread in the worker, that falls back to running work in the
+    calling thread.
+
+    A process forked from one with a pool, such as a background callback's
+    job, runs its work inline, as it's already apart from the worker's
+    request threads; a gunicorn worker calls `reset` to use a pool again.
+    """
+    def __init__(self, max_workers, max_pending, timeout_seconds):
+        """
+        Parameters
+        ----------
+
+        max_workers: int
+            The number of worker processes, or 0 to run everything in the
+            calling thread.
+
+        max_pending: int
+            The most tasks queued or running in the pool at once. Work
+            submitted beyond that runs in the calling thread.
+
+        timeout_seconds: float
+            How long `run` and `run_async` wait for a task by default.
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout_seconds = timeout_seconds
+        self._executor = None
+        self.reset()
+        os.register_at_fork(after_in_child=lambda: self.reset(enabled=False))
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Forking a worker that's serving requests from several
+                # threads isn't safe, so the pool's processes are forked
+                # from a server process that has imported the engine once
+                context = multiprocessing.get_context(
+                    'forkserver'
+                    if 'forkserver' in multiprocessing.get_all_start_methods()
+                    else 'spawn')
+                if context.get_start_method() == 'forkserver':
+                    context.set_forkserver_preload(['source.base'])
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=context)
+            return self._executor
+
+    def start(self):
+        """
+        Starts the pool's processes now rather than on first use, which
+        takes them a couple of seconds as they import the engine.
+        """
+        if self.enabled and self.max_workers:
+            self._get_executor().submit(int)
+
+    def reset(self, enabled=True):
+        """
+        Forgets the pool without shutting it down, as the copy of it in a
+        forked process doesn't work, and starts a new one on next use unless
+        `enabled` is False. Nothing inherited is touched, since another
+        thread may have been holding it when the process was forked.
+        """
+        # Kept referenced, so that collecting it doesn't signal the parent's
+        # pool
+        self._inherited_executor = self._executor
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self.enabled = enabled
+
+    def shutdown(self):
+        """Stops the pool's processes, cancelling any queued work."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _run_inline(func, args, kwargs):
+        """Runs work in the calling thread, returning its finished future."""
+        future = Future()
+        try:
+            future.set_result(func(*args, **kwargs))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Starts `func(*args, **kwargs)` in the pool and returns its
+        `concurrent.futures.Future`, or runs it in the calling thread and
+        returns a finished one if the pool is disabled, full or broken.
+        """
+        if (not self.enabled or not self.max_workers
+                or not self._slots.acquire(blocking=False)):
+            return self._run_inline(func, args, kwargs)
+        slots = self._slots
+        try:
+            future = self._get_executor().submit(func, *args, **kwargs)
+        except (BrokenProcessPool, RuntimeError):
+            slots.release()
+            self.shutdown()
+            return self._run_inline(func, args, kwargs)
+        # The slot is freed when the task finishes, not when a caller stops
+        # waiting for it, so timed out tasks still count against the bound
+        future.add_done_callback(lambda _: slots.release())
+        return future
+
+    def run(self, func, *args, timeout=None, **kwargs):
+        """
+        Runs `func(*args, **kwargs)` in the pool and blocks until it returns,
+        raising `ComputeTimeoutError` if it takes longer than `timeout`
+        seconds, by default `timeout_seconds`. Work that falls back to the
+        calling thread isn't time limited.
+        """
+        timeout = self.timeout_seconds if timeout is None else timeout
+        future = self.submit(func, *args, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise ComputeTimeoutError(timeout) from None
+        except BrokenProcessPool:
+            # A worker process died, e.g. killed for running out of memory
+            self.shutdown()
+            return func(*args, **kwargs)
+
+    async def run_async(self, func, *args, timeout=None, **kwargs):
+        """`run` for async callbacks, awaiting the result."""
+        timeout = self.timeout_seconds if timeout is None else timeout
+        future = self.submit(func, *args, **kwargs)
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            raise ComputeTimeoutError(timeout) from None
+        except BrokenProcessPool:
+            self.shutdown()
+            return func(*args, **kwargs)
+
+
+# Shared by every thread in the worker process
+compute_pool = ComputePool(
+    max_workers=OFFLOAD_CONFIG['max_workers'],
+    max_pending=OFFLOAD_CONFIG['max_pending'],
+    timeout_seconds=OFFLOAD_CONFIG['timeout_seconds'])
@@ -0,0 +1,78 @@
+"""Vectorized payment-date calendars."""
+
+import numpy as np
+
+# Days between payments for the frequencies that don't follow the calendar
+PAYMENT_INTERVAL_DAYS = {'Weekly': 7, 'Fortnightly': 14}
+
+
+def nth_payment_dates(first_payment_dates, payment_frequencies, numbers):
+    """
+    Returns the date of payment number `numbers` (0 being the first payment)
+    for each combination of first payment date and frequency. All three
+    arguments broadcast against each other, so the same call can lay out one
+    debt's whole calendar or find one date for each debt in a portfolio.
+
+    Monthly payments fall on the same day of the month as the first payment,
+    or on the last day of months that are too short for it, taking leap
+    years into account. A debt first paid on the 31st is paid on Feb 28 or
+    Feb 29 and back on the 31st in March.
+
+    Parameters
+    ----------
+
+    first_payment_dates: str, datetime or array-like of either
+        The date of the first payment, e.g. '2025-01-31'.
+
+    payment_frequencies: str or array-like of str
+        One of 'Monthly', 'Fortnightly' or 'Weekly', in any case.
+
+    numbers: int or array-like of int
+        How many payments after the first payment.
+
+    Returns
+    -------
+
+    np.ndarray of datetime64[D]
+    """
+    first = np.asarray(first_payment_dates, dtype='datetime64[D]')
+    frequencies = np.char.capitalize(
+        np.asarray(payment_frequencies, dtype=str))
+    numbers = np.asarray(numbers, dtype=np.int64)
+    first, frequencies, numbers = np.broadcast_arrays(
+        first, frequencies, numbers)
+
+    interval_days = np.zeros(frequencies.shape, dtype=np.int64)
+    for frequency, days in PAYMENT_INTERVAL_DAYS.items():
+        interval_days[frequencies == frequency] = days
+    monthly = frequencies == 'Monthly'
+    unknown = (interval_days == 0) & ~monthly
+    if unknown.any():
+        raise ValueError(
+            f"Unsupported payment frequency: {frequencies[unknown][0]}")
+
+    dates = first + numbers * interval_days
+    if monthly.any():
+        first_month = first[monthly].astype('datetime64[M]')
+        day_offset = first[monthly] - first_month.astype('datetime64[D]')
+        months = first_month + numbers[monthly]
+        month_starts = months.astype('datetime64[D]')
+        month_lengths = (months + 1).astype('datetime64[D]') - month_starts
+        dates[monthly] = month_starts + np.minimum(
+            day_offset, month_lengths - np.timedelta64(1, 'D'))
+    return dates
+
+
+def payment_dates(first_payment_date, payment_frequency, periods):
+    """
+    Returns the dates of the first `periods` payments on a debt as a
+    datetime64[D] array.
+    """
+    return nth_payment_dates(
+        first_payment_date, payment_frequency, np.arange(periods))
+
+
+def format_dates(dates):
+    """Formats a datetime64 array as a list of 'YYYY-MM-DD' strings."""
+    return np.datetime_as_string(
+        np.asarray(dates, dtype='datetime64[D]'), unit='D').tolist()
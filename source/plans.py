@@ -0,0 +1,260 @@
+"""Debt payoff plan simulation (avalanche, snowball and minimum payments)."""
+
+import numpy as np
+import source.base as b
+from source import engine as e
+from source import payment_calendar as pc
+from source.utils import constants as c
+
+PLAN_TYPES = ('avalanche', 'snowball', 'minimum')
+
+# Plans stop after this many years even if a debt is still carrying a balance,
+# e.g. when a minimum payment doesn't cover the interest that accrues on it
+MAX_PLAN_YEARS = 100
+
+
+class PlanResult():
+    """
+    The outcome of running a payoff plan over a portfolio of debts.
+
+    Attributes
+    ----------
+
+    plan_type: str
+        One of `PLAN_TYPES`.
+
+    payment_frequency: str
+        The frequency every debt was paid at during the plan.
+
+    dates: list of str
+        The payment date of each plan period as 'YYYY-MM-DD'.
+
+    balances: np.ndarray
+        The balance remaining on each debt after each period, shaped
+        (number of debts, number of periods).
+
+    total_balance: np.ndarray
+        The combined balance remaining across all debts after each period.
+
+    payoff_periods: np.ndarray
+        The number of periods it takes to pay off each debt, or 0 for a debt
+        that is still carrying a balance when the plan stops.
+
+    payoff_dates: list of str or None
+        The date each debt is paid off, or None if it never is.
+
+    interest: np.ndarray
+        The total interest paid on each debt.
+    """
+    def __init__(self, plan_type, payment_frequency, dates, balances,
+                 payoff_periods, payoff_dates, interest):
+        self.plan_type = plan_type
+        self.payment_frequency = payment_frequency
+        self.dates = dates
+        self.balances = balances
+        self.total_balance = balances.sum(axis=0)
+        self.payoff_periods = payoff_periods
+        self.payoff_dates = payoff_dates
+        self.interest = interest
+        self.total_interest = float(interest.sum())
+        self.paid_off = bool((payoff_periods > 0).all())
+        self.payoff_date = dates[-1] if self.paid_off and dates else None
+
+
+def debts_from_store(debt_details_data):
+    """
+    Builds `base.Debt` objects from the debt-details-store data, in debt
+    index order.
+    """
+    return [
+        b.Debt(
+            name=debt['name'], account_type='personal',
+            balance=float(debt['balance']),
+            interest_rate=float(debt['rate']),
+            interest_calculation_method='simple',
+            payment_frequency=debt['frequency'],
+            next_payment_date=debt['next_payment_date'],
+            payment_amount=float(debt['payment_amount']))
+        for _, debt in sorted(
+            debt_details_data.items(), key=lambda item: int(item[0]))]
+
+
+def plan_frequency(debts):
+    """
+    The frequency a plan runs at: the debts' shared frequency if they all
+    have one, otherwise monthly.
+    """
+    frequencies = {debt.payment_frequency.capitalize() for debt in debts}
+    if len(frequencies) == 1:
+        return frequencies.pop()
+    return 'Monthly'
+
+
+def payment_priority(plan_type, balances, rates):
+    """
+    Returns debt indices in the order extra payments are applied. Avalanche
+    favors the highest interest rate and snowball the lowest starting
+    balance, each using the other as the tie breaker.
+    """
+    if plan_type == 'avalanche':
+        return np.lexsort((balances, -rates))
+    if plan_type == 'snowball':
+        return np.lexsort((-rates, balances))
+    return np.arange(len(balances))
+
+
+def amortize_separately(balance, rates, payment, payment_frequency):
+    """
+    Runs the minimum payments plan, where every debt amortizes on its own,
+    as one `engine.batch_amortization` of the portfolio. Returns the
+    balances after each period, shaped (number of debts, number of
+    periods), the period each debt is paid off in and the interest paid on
+    each, or None if a debt isn't paid off within `MAX_PLAN_YEARS`, which
+    `step_plan` handles.
+    """
+    try:
+        batch = e.batch_amortization(
+            balance, rates, payment, [payment_frequency] * len(balance),
+            max_years=MAX_PLAN_YEARS)
+    except (e.NegativeAmortizationError, e.ScheduleTooLongError):
+        return None
+    periods = batch.periods
+    balances = np.zeros((len(periods), int(periods.max(initial=0))))
+    rows = np.arange(len(batch.balances))
+    balances[np.repeat(np.arange(len(periods)), periods),
+             rows - np.repeat(batch.offsets[:-1], periods)] = batch.balances
+    return balances, periods.astype(np.int64), batch.total_interest
+
+
+def step_plan(balance, period_rate, payment, priority, rolls_over,
+              max_periods):
+    """
+    Runs a plan one period at a time for every debt at once until every
+    debt is paid off or `max_periods` have passed, applying freed payments
+    in `priority` order if `rolls_over`. Returns the same as
+    `amortize_separately`, with a payoff period of 0 for debts still
+    carrying a balance.
+    """
+    history = []
+    interest_paid = np.zeros(len(balance))
+    payoff_periods = np.zeros(len(balance), dtype=np.int64)
+    freed_payments = 0.0
+    period = 0
+    while (balance > 0).any() and period < max_periods:
+        period += 1
+        # Starting balances can have more than two decimals; from the second
+        # period on every amount is a whole cent
+        to_cents = e.round_cents if period == 1 else e.snap_cents
+        active = balance > 0
+        interest = np.where(active, e.round_cents(balance * period_rate), 0.0)
+        final = active & (payment >= balance)
+        principal = np.where(
+            final, balance, e.snap_cents(payment - interest))
+        balance = np.where(
+            active, np.where(final, 0.0, to_cents(balance - principal)),
+            0.0)
+        interest_paid += interest
+
+        if rolls_over:
+            leftover = payment - (principal + interest)
+            extra = freed_payments + leftover[final].clip(min=0).sum()
+            ordered_balance = balance[priority]
+            applied_before = np.cumsum(ordered_balance) - ordered_balance
+            applied = (extra - applied_before).clip(0, ordered_balance)
+            balance[priority] = to_cents(ordered_balance - applied)
+
+        closed = active & (balance <= 0)
+        payoff_periods[closed] = period
+        freed_payments += payment[closed].sum()
+        history.append(balance)
+
+    balances = np.array(history).T if history else np.zeros((len(balance), 0))
+    return balances, payoff_periods, interest_paid
+
+
+def simulate_plan(debts, plan_type, payment_frequency=None, start_date=None):
+    """
+    Simulates paying off a portfolio of debts with the given plan.
+
+    Every debt advances one period per step, using the same per-period cent
+    rounding as `base.Amortization`. Under the avalanche and snowball plans,
+    the payment of each debt that has been paid off, along with whatever is
+    left of a final payment, is applied to the unpaid debts in priority
+    order. Under the minimum payments plan each debt amortizes on its own,
+    so when they're all paid off within `MAX_PLAN_YEARS` the portfolio is
+    run as one `engine.batch_amortization`.
+    Plan payments are rounded to the cent, so for debts paid in whole cents
+    at the plan's frequency the minimum payments plan reproduces each
+    debt's `base.Amortization` schedule, whatever its starting balance.
+
+    Parameters
+    ----------
+
+    debts: list of base.Debt
+        The debts in the portfolio.
+
+    plan_type: {'avalanche', 'snowball', 'minimum'}
+        The payoff strategy.
+
+    payment_frequency: {'Monthly', 'Fortnightly', 'Weekly'}, optional
+        The frequency every debt is paid at during the plan. Payments made at
+        another frequency are converted to the same yearly amount. Defaults
+        to `plan_frequency(debts)`.
+
+    start_date: str, optional
+        The date of the first plan payment as 'YYYY-MM-DD'. Defaults to the
+        earliest next payment date among the debts.
+
+    Returns
+    -------
+
+    PlanResult
+        A plan with no periods when there are no debts.
+    """
+    if plan_type not in PLAN_TYPES:
+        raise ValueError(f"Unsupported plan_type: {plan_type}")
+    if payment_frequency is None:
+        payment_frequency = plan_frequency(debts)
+    if not debts:
+        return PlanResult(plan_type, payment_frequency, [], np.zeros((0, 0)),
+                          np.zeros(0, dtype=np.int64), [], np.zeros(0))
+    if start_date is None:
+        start_date = min(debt.next_payment_date for debt in debts)
+    payments_per_year = c.PAYMENTS_PER_YEAR[payment_frequency]
+
+    balance = np.array([debt.balance for debt in debts], dtype=np.float64)
+    rates = np.array([debt.interest_rate for debt in debts], dtype=np.float64)
+    period_rate = 0.01 * rates / payments_per_year
+    payment = e.round_cents(np.array([
+        debt.payment_amount
+        * c.PAYMENTS_PER_YEAR[debt.payment_frequency.capitalize()]
+        / payments_per_year
+        for debt in debts], dtype=np.float64))
+    max_periods = MAX_PLAN_YEARS * payments_per_year
+    result = None
+    if plan_type == 'minimum':
+        result = amortize_separately(
+            balance, rates, payment, payment_frequency)
+    if result is None:
+        result = step_plan(
+            balance, period_rate, payment,
+            payment_priority(plan_type, balance, rates),
+            plan_type != 'minimum', max_periods)
+    balances, payoff_periods, interest_paid = result
+    period = balances.shape[1]
+
+    dates = pc.format_dates(
+        pc.payment_dates(start_date, payment_frequency, period))
+    payoff_dates = [
+        dates[periods - 1] if periods else None
+        for periods in payoff_periods]
+    return PlanResult(plan_type, payment_frequency, dates, balances,
+                      payoff_periods, payoff_dates, interest_paid)
+
+
+def compare_plans(debts, payment_frequency=None, start_date=None):
+    """Runs every plan type over the same debts, keyed by plan type."""
+    return {
+        plan_type: simulate_plan(
+            debts, plan_type, payment_frequency, start_date)
+        for plan_type in PLAN_TYPES}
@@ -0,0 +1,254 @@
+"""
+Optional server-side storage of each browser session's amortizations.
+
+When enabled, amortizations-store holds only a small reference to the
+session's data, e.g. {'session_id': '...', 'revision': 3}, rather than
+every debt's schedule, so callbacks that take the store as State upload the
+same few bytes however many debts there are. `load_amortizations` and
+`save_amortizations` translate between the two, and pass store data
+straight through when the session store is disabled.
+"""
+
+import json
+import os
+import queue
+import secrets
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from source.config import SESSION_STORE_CONFIG
+
+
+class SessionStoreFullError(ValueError):
+    """Raised when saving a value would take a session over its byte cap."""
+    def __init__(self, max_bytes):
+        super().__init__(
+            "This portfolio is too large to save; try removing a debt first")
+        self.max_bytes = max_bytes
+
+
+class SessionExpiredError(ValueError):
+    """
+    Raised when amortizations-store refers to a session the store no longer
+    holds, e.g. one past its TTL, while the browser still has its debts.
+    """
+    def __init__(self, session_id):
+        super().__init__(
+            "Your session has expired; reload the page to start again")
+        self.session_id = session_id
+
+
+class SQLiteSessionStore():
+    """
+    A key-value store of JSON values per session, kept in SQLite.
+
+    Connections are pooled and shared by every thread in the worker, and
+    the database runs in WAL mode so workers sharing the file don't block
+    each other's reads. A forked process, such as a background callback's
+    job, opens its own connections. Sessions not written to for `ttl_seconds` are
+    treated as gone and are deleted every `sweep_every` writes.
+    """
+    def __init__(self, path, max_session_bytes, ttl_seconds, pool_size,
+                 sweep_every=100):
+        """
+        Parameters
+        ----------
+
+        path: str
+            The SQLite database file, created if it doesn't exist.
+
+        max_session_bytes: int
+            The most bytes of JSON one session may hold across its keys.
+
+        ttl_seconds: int
+            How long a session lives after its last write.
+
+        pool_size: int
+            The number of connections kept open.
+
+        sweep_every: int
+            How many writes happen between deletions of expired sessions.
+        """
+        self.path = path
+        self.max_session_bytes = max_session_bytes
+        self.ttl_seconds = ttl_seconds
+        self.pool_size = pool_size
+        self.sweep_every = sweep_every
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        self._pool = queue.Queue()
+        self.open()
+        os.register_at_fork(after_in_child=self._reopen_after_fork)
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS session_values ("
+                "session_id TEXT NOT NULL, key TEXT NOT NULL, "
+                "value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "updated REAL NOT NULL, PRIMARY KEY (session_id, key))")
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS session_values_updated "
+                "ON session_values (updated)")
+
+    def _connect(self):
+        connection = sqlite3.connect(
+            self.path, timeout=10, check_same_thread=False,
+            isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def open(self):
+        """Opens the pool's connections."""
+        for _ in range(self.pool_size):
+            self._pool.put(self._connect())
+
+    def _reopen_after_fork(self):
+        # The inherited connections are kept referenced but never used, as
+        # closing them could disturb the parent's use of the database, and
+        # the pool they're in may have been locked by another thread
+        self._inherited_pool = self._pool
+        self._pool = queue.Queue()
+        self._writes_lock = threading.Lock()
+        self.open()
+
+    def close(self):
+        """
+        Closes the pool's connections. A SQLite connection mustn't be used
+        across a fork, so a process that forks workers after using the store
+        closes it first, leaving the workers nothing to inherit.
+        """
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    @contextmanager
+    def _connection(self):
+        """Borrows a pooled connection, waiting for one if all are in use."""
+        connection = self._pool.get()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    @staticmethod
+    def new_session_id():
+        return secrets.token_urlsafe(16)
+
+    def get(self, session_id, key, default=None):
+        """Returns a session's value for `key`, or `default` if it has none."""
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT value FROM session_values "
+                "WHERE session_id = ? AND key = ? AND updated >= ?",
+                (session_id, key, time.time() - self.ttl_seconds)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, session_id, key, value):
+        """
+        Stores a session's value for `key`, raising `SessionStoreFullError`
+        if the session would hold more than `max_session_bytes`.
+        """
+        serialized = json.dumps(value, separators=(',', ':'))
+        size = len(serialized.encode())
+        now = time.time()
+        with self._connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                other_bytes = connection.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM session_values "
+                    "WHERE session_id = ? AND key != ? AND updated >= ?",
+                    (session_id, key, now - self.ttl_seconds)).fetchone()[0]
+                if other_bytes + size > self.max_session_bytes:
+                    raise SessionStoreFullError(self.max_session_bytes)
+                connection.execute(
+                    "INSERT OR REPLACE INTO session_values "
+                    "(session_id, key, value, size, updated) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (session_id, key, serialized, size, now))
+                # Keep every key of the session alive together
+                connection.execute(
+                    "UPDATE session_values SET updated = ? "
+                    "WHERE session_id = ?", (now, session_id))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        with self._writes_lock:
+            self._writes += 1
+            sweep = self._writes % self.sweep_every == 0
+        if sweep:
+            self.evict_expired()
+
+    def evict_expired(self):
+        """Deletes every session not written to within the TTL."""
+        with self._connection() as connection:
+            return connection.execute(
+                "DELETE FROM session_values WHERE updated < ?",
+                (time.time() - self.ttl_seconds,)).rowcount
+
+    def stats(self):
+        """Returns the number of live sessions and the bytes they hold."""
+        with self._connection() as connection:
+            sessions, total_bytes = connection.execute(
+                "SELECT COUNT(DISTINCT session_id), COALESCE(SUM(size), 0) "
+                "FROM session_values WHERE updated >= ?",
+                (time.time() - self.ttl_seconds,)).fetchone()
+        return {'sessions': sessions, 'bytes': total_bytes}
+
+
+def is_session_reference(store_data):
+    return isinstance(store_data, dict) and 'session_id' in store_data
+
+
+def load_amortizations(amortizations_data):
+    """
+    Returns the list of amortizations held in amortizations-store, fetching
+    it from the session store if the store holds a reference to it.
+
+    Raises `SessionExpiredError` if the session it refers to is gone, rather
+    than returning an empty list the next save would overwrite the
+    session's debts with.
+    """
+    if is_session_reference(amortizations_data):
+        session_id = amortizations_data['session_id']
+        amortizations = None
+        if session_store is not None:
+            amortizations = session_store.get(session_id, 'amortizations')
+        if amortizations is None:
+            raise SessionExpiredError(session_id)
+        return amortizations
+    return amortizations_data or []
+
+
+def save_amortizations(updated_amortizations, amortizations_data):
+    """
+    Returns what to write to amortizations-store for a new list of
+    amortizations, given what it held before. With the session store
+    enabled the list is saved on the server and a reference with a new
+    revision is returned, so the store still changes and triggers its
+    listeners.
+    """
+    if session_store is None:
+        return updated_amortizations
+    if is_session_reference(amortizations_data):
+        session_id = amortizations_data['session_id']
+        revision = amortizations_data.get('revision', 0) + 1
+    else:
+        session_id = session_store.new_session_id()
+        revision = 1
+    session_store.set(session_id, 'amortizations', updated_amortizations)
+    return {'session_id': session_id, 'revision': revision}
+
+
+# Shared by every thread in the worker process, or None when amortizations
+# are kept in the browser
+session_store = (
+    SQLiteSessionStore(
+        path=SESSION_STORE_CONFIG['path'],
+        max_session_bytes=SESSION_STORE_CONFIG['max_session_bytes'],
+        ttl_seconds=SESSION_STORE_CONFIG['ttl_seconds'],
+        pool_size=SESSION_STORE_CONFIG['pool_size'])
+    if SESSION_STORE_CONFIG['backend'] == 'sqlite' else None)
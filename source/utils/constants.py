@@ -1,11 +1,16 @@
-import plotly.express.colors as color
-
 # The color_order determines the order of colors used in the payoff graph and 
-# amortization cards as debts are added
-color_order = color.qualitative.Dark24
+# amortization cards as debts are added. It's Plotly's Dark24 palette, copied 
+# here so that reading it doesn't import plotly.express.
+color_order = [
+    '#2E91E5', '#E15F99', '#1CA71C', '#FB0D0D', '#DA16FF', '#222A2A',
+    '#B68100', '#750D86', '#EB663B', '#511CFB', '#00A08B', '#FB00D1',
+    '#FC0080', '#B2828D', '#6C7C32', '#778AAE', '#862A16', '#A777F1',
+    '#620042', '#1616A7', '#DA60CA', '#6C4516', '#0D2A63', '#AF0038'
+]
 
 # Payment frequency definitions
 PAYMENT_FREQUENCY_DAYS = {'Monthly': 31, 'Fortnightly': 14, 'Weekly': 7}
+PAYMENTS_PER_YEAR = {'Monthly': 12, 'Fortnightly': 26, 'Weekly': 52}
 
 # Interest rate calculation constants
 DAYS_IN_YEAR_FOR_PERCENTAGE = 36500  # 365 * 100 for percentage calculation
@@ -13,6 +18,13 @@ DAYS_IN_YEAR_FOR_PERCENTAGE = 36500  # 365 * 100 for percentage calculation
 # UI constants
 FORMATTING_DIVISOR = 1000  # Division factor for formatting (e.g., thousands)
 SCROLL_DELAY_MS = 200  # Timeout delay in milliseconds for auto-scroll
+AMORTIZATION_TABLE_PAGE_SIZE = 24  # Rows per page of an amortization table
+# Plan card titles, by plans.PLAN_TYPES entry
+PLAN_TYPE_LABELS = {
+    'avalanche': 'Avalanche',
+    'snowball': 'Snowball',
+    'minimum': 'Minimum Payments Only'
+}
 
 # Form field validation constants
 MAX_DEBT_BALANCE = 1000000  # Maximum debt balance
@@ -0,0 +1,72 @@
+"""Downsampling of long series for plotting."""
+
+import numpy as np
+
+
+def lttb(x, y, max_points):
+    """
+    Picks at most `max_points` points of a series with the
+    largest-triangle-three-buckets algorithm, which keeps the points that
+    contribute most to the shape of the line. The first and last points are
+    always kept.
+
+    Parameters
+    ----------
+
+    x: array-like of float
+        The x values, in increasing order.
+
+    y: array-like of float
+        The y values.
+
+    max_points: int
+        The most points to keep. Values below 3, or at least the length of
+        the series, keep every point.
+
+    Returns
+    -------
+
+    np.ndarray of int
+        The indices of the kept points, in increasing order.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if max_points < 3 or max_points >= n:
+        return np.arange(n)
+
+    # Every point between the first and last falls in one of max_points - 2
+    # buckets, and one point is kept from each
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+
+    # The third corner of each bucket's triangles is the average of the next
+    # bucket, or the last point for the last bucket
+    next_starts = np.append(edges[1:-1], n - 1)
+    next_stops = np.append(edges[2:], n)
+    x_sums = np.concatenate(([0.0], np.cumsum(x)))
+    y_sums = np.concatenate(([0.0], np.cumsum(y)))
+    counts = next_stops - next_starts
+    next_x = ((x_sums[next_stops] - x_sums[next_starts]) / counts).tolist()
+    next_y = ((y_sums[next_stops] - y_sums[next_starts]) / counts).tolist()
+
+    # Buckets hold a handful of points each, so picking from them is faster
+    # on lists than with an array operation per bucket
+    edges = edges.tolist()
+    xs = x.tolist()
+    ys = y.tolist()
+    kept = [0]
+    previous = 0
+    for bucket in range(max_points - 2):
+        previous_x, previous_y = xs[previous], ys[previous]
+        largest = -1.0
+        for i in range(edges[bucket], edges[bucket + 1]):
+            # Twice the area of the triangle with the previously kept point
+            area = abs(
+                (previous_x - next_x[bucket]) * (ys[i] - previous_y)
+                - (previous_x - xs[i]) * (next_y[bucket] - previous_y))
+            if area > largest:
+                largest, candidate = area, i
+        previous = candidate
+        kept.append(previous)
+    kept.append(n - 1)
+    return np.array(kept, dtype=np.int64)
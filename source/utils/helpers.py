@@ -1,5 +1,12 @@
 from datetime import datetime
 import source.base as b
+from source import background
+from source import cache
+from source import engine as e
+from source import offload
+from source import plans
+from source.config import OFFLOAD_CONFIG
+from source.instrumentation import operation_metrics
 import dash_mantine_components as dmc
 import dash.html
 from dash_iconify import DashIconify
@@ -18,11 +25,35 @@ def get_amortization(
         name, account_type, balance, interest_rate, 
         interest_calculation_method, payment_frequency, next_payment_date, 
         payment_amount):
+    """
+    Creates an Amortization with its schedule filled in, reusing the cached
+    schedule when a debt with the same terms was amortized before. Long 
+    schedules are generated in the offload pool. In a background callback's
+    job the cache is skipped, as the job's copy of it is thrown away.
+    """
     amort = b.Amortization(
         name, account_type, balance, interest_rate, 
         interest_calculation_method, payment_frequency, 
         next_payment_date, payment_amount)
-    amort.generate_amortization()
+    key = cache.amortization_key(
+        balance, interest_rate, payment_frequency, payment_amount,
+        next_payment_date)
+
+    def generate_amortization():
+        with operation_metrics.time('schedule_generation'):
+            estimated_periods = e.estimate_periods(
+                amort.debt.balance, amort.period_rate(), 
+                amort.debt.payment_amount)
+            if estimated_periods >= OFFLOAD_CONFIG['min_periods']:
+                return offload.compute_pool.run(amort.generate_amortization)
+            return amort.generate_amortization()
+
+    if background.in_job():
+        amort.amortization = generate_amortization()
+    else:
+        amort.amortization = cache.amortization_cache.get_or_compute(
+            key, generate_amortization)
+    amort.period = len(amort.amortization)
     return amort
 
 def check_debt_index(field_name, debt_index):
@@ -241,6 +272,94 @@ def create_debt_form(mode="add", debt_data=None, debt_index=None):
     
     return form
 
+def create_debt_card(debt_index, debt_data):
+    """
+    Renders a debt's details card from its debt-details-store entry, with
+    its payoff date and total interest from `Amortization.payoff_summary`
+    rather than its schedule.
+    """
+    name = debt_data['name']
+    balance = debt_data['balance']
+    rate = debt_data['rate']
+    payment_amount = debt_data['payment_amount']
+    frequency = debt_data['frequency']
+    next_payment_date = debt_data['next_payment_date']
+    debt_color = debt_data['color']
+
+    summary = b.Amortization(
+        name, 'personal', float(balance), float(rate), 'simple', frequency,
+        next_payment_date, float(payment_amount)).payoff_summary()
+    # The total interest is only an estimate, to within a few dollars, when
+    # the summary didn't run the schedule's recurrence
+    total_interest = (
+        f"${summary.total_interest:,.2f}" if summary.exact
+        else f"About ${summary.total_interest:,.0f}")
+    payoff_lines = [
+        dmc.Text(f"Paid Off On {summary.payoff_date} With {total_interest} "
+                 "Total Interest", size="xs")
+    ] if summary.periods else []
+
+    return dash.html.Div([
+        dmc.Card([
+            dmc.CardSection([
+                dmc.Grid([
+                    dmc.GridCol(dash.html.H4(
+                        name, 
+                        className='card_title'), span=9),
+                    dmc.GridCol(
+                        dmc.Group([
+                            dmc.ActionIconGroup([
+                                dmc.ActionIcon(
+                                    DashIconify(
+                                        icon='iconoir:edit', 
+                                        width=20
+                                    ),
+                                    size='lg',
+                                    n_clicks=0,
+                                    color="blue",
+                                    variant='subtle', 
+                                    id={
+                                        'type': 'open_edit_debt_form_button', 
+                                        'index': debt_index
+                                        }),
+                                dmc.ActionIcon(
+                                    DashIconify(
+                                        icon='iconoir:xmark-circle', 
+                                        width=20
+                                    ),
+                                    size='lg',
+                                    n_clicks=0,
+                                    color='red',
+                                    variant='subtle',
+                                    id={
+                                        'type': 'delete_debt',
+                                        'index': debt_index
+                                        }
+                                    ),
+                            ])
+                        ], justify="flex-end"),
+                        span=3
+                    )
+                ], gutter="xs"),
+                dmc.Stack([
+                    dmc.Text(f"${float(balance):,.2f} Balance with {float(rate):,.2f}% Interest Rate", size="xs"),
+                    dmc.Text(f"Paying ${float(payment_amount):,.2f} Every {frequency[:-2]}", size="xs"),
+                    dmc.Text(f"Next Payment On {next_payment_date}", size="xs"),
+                    *payoff_lines
+                ], gap=2)
+            ], p="sm")
+        ], style={"borderColor": debt_color, "width": "100%", "maxWidth": "calc(100vw - 48px)"}, withBorder=True),
+        dash.html.Hr()], 
+        id={'type': 'debt_cards', 'index': debt_index})
+
+def debt_card_position(debt_details_data, debt_index):
+    """
+    Returns where a debt's card sits in the debt cards container. Debt 
+    indices only ever increase, so cards are in debt index order.
+    """
+    return sorted(int(index) for index in debt_details_data).index(
+        int(debt_index))
+
 def lighten_hex_color(hex_code, amount=0.5):
     """
     From a hex code, convert to RGB, blend with white, and return the 
@@ -257,24 +376,51 @@ def lighten_hex_color(hex_code, amount=0.5):
 
     return '#{:02x}{:02x}{:02x}'.format(r, g, b)
 
-def create_plans_coming_soon():
+def create_plan_card(plan, minimum_plan=None):
     """
-    Creates a simple "Coming Soon" placeholder for the Plans tab
+    Renders a plan's card from its `plans.PlanResult`, with the interest it
+    saves over paying the minimums when `minimum_plan` is given and paid
+    off.
     """
+    if plan.paid_off:
+        payoff_line = f"Debt Free On {plan.payoff_date}"
+    else:
+        payoff_line = f"Not Debt Free Within {plans.MAX_PLAN_YEARS} Years"
+    lines = [
+        dmc.Text(payoff_line, size="xs"),
+        dmc.Text(f"${plan.total_interest:,.2f} Total Interest", size="xs")
+    ]
+    if minimum_plan is not None and minimum_plan.paid_off:
+        saved = minimum_plan.total_interest - plan.total_interest
+        lines.append(dmc.Text(
+            f"Saves ${saved:,.2f} Interest Over Minimum Payments", size="xs"))
+
     return dash.html.Div([
-        dmc.Center([
-            dmc.Stack([
-                dmc.ThemeIcon(
-                    DashIconify(icon="iconoir:rocket", width=40),
-                    size=80,
-                    radius="xl",
-                    variant="light",
-                    color="blue"
-                ),
-                dmc.Title("Coming Soon", order=2),
-            ], 
-            align="center",
-            gap="md",
-            style={"padding": "20px"})
-        ])
-    ], style={"display": "flex", "justifyContent": "center", "marginTop": "40px"})
\ No newline at end of file
+        dmc.Card([
+            dmc.CardSection([
+                dash.html.H4(
+                    c.PLAN_TYPE_LABELS[plan.plan_type], className='card_title'),
+                dmc.Stack(lines, gap=2)
+            ], p="sm")
+        ], style={"width": "100%", "maxWidth": "calc(100vw - 48px)"},
+            withBorder=True),
+        dash.html.Hr()])
+
+def create_plan_comparison(plan_results):
+    """
+    Renders a card for each plan in `plan_results`, as returned by
+    `plans.compare_plans`, or a placeholder when there are no debts to plan
+    for.
+    """
+    if not plan_results or not len(plan_results['minimum'].dates):
+        return dash.html.Div(
+            "Add a debt to compare payoff plans.", className="text-center p-3")
+    minimum_plan = plan_results['minimum']
+    return dash.html.Div([
+        dmc.Text(
+            f"All Debts Paid {minimum_plan.payment_frequency}", size="xs",
+            c="dimmed", mb="xs"),
+        *[create_plan_card(
+            plan, None if plan_type == 'minimum' else minimum_plan)
+          for plan_type, plan in plan_results.items()]
+    ])
@@ -0,0 +1,117 @@
+"""Compact, columnar encoding of amortization schedules for dcc.Store."""
+
+import base64
+import numpy as np
+from source import payment_calendar as pc
+
+# Store column keys and the amortization DataFrame columns they hold
+SCHEDULE_COLUMNS = {
+    'amount': 'Payment Amount',
+    'interest': 'Interest',
+    'principal': 'Principal',
+    'balance': 'Balance Remaining'
+}
+
+# 'json' stores each column as a list of integer cents, 'base64' as a
+# base64-encoded buffer of little-endian int32 cents
+ENCODINGS = ('json', 'base64')
+
+_INT32 = np.iinfo(np.int32)
+
+
+def encode_column(cents, encoding):
+    """Encodes an integer array of cents for the store."""
+    if encoding == 'base64':
+        return base64.b64encode(cents.astype('<i4').tobytes()).decode('ascii')
+    return cents.tolist()
+
+
+def decode_column(value, encoding):
+    """Decodes a stored column back into an int64 array of cents."""
+    if encoding == 'base64':
+        return np.frombuffer(
+            base64.b64decode(value), dtype='<i4').astype(np.int64)
+    return np.asarray(value, dtype=np.int64)
+
+
+def encode_schedule(amortization, payment_frequency, encoding='base64'):
+    """
+    Encodes an amortization DataFrame as a columnar store payload.
+
+    Amounts are stored as whole cents, so nothing is lost, and payment dates
+    aren't stored at all: they're rebuilt from the first payment date and
+    the frequency by `decode_schedule`. Columns that don't fit in int32 are
+    stored as JSON lists whatever `encoding` asks for.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unsupported encoding: {encoding}")
+    columns = {
+        key: np.rint(amortization[column].to_numpy(dtype=np.float64) * 100)
+        .astype(np.int64)
+        for key, column in SCHEDULE_COLUMNS.items()}
+    if encoding == 'base64' and any(
+            len(cents) and (cents.min() < _INT32.min or cents.max() > _INT32.max)
+            for cents in columns.values()):
+        encoding = 'json'
+    dates = amortization['Payment Date']
+    return {
+        'first_payment_date': dates.iloc[0] if len(dates) else None,
+        'frequency': payment_frequency,
+        'periods': len(amortization),
+        'encoding': encoding,
+        'columns': {
+            key: encode_column(cents, encoding)
+            for key, cents in columns.items()}
+    }
+
+
+def decode_schedule(schedule):
+    """
+    Decodes a store payload made by `encode_schedule` into a dict of
+    'YYYY-MM-DD' date strings under 'dates' and float dollar arrays under
+    each of the `SCHEDULE_COLUMNS` keys.
+    """
+    decoded = {
+        key: decode_column(value, schedule['encoding']) / 100
+        for key, value in schedule['columns'].items()}
+    decoded['dates'] = pc.format_dates(pc.payment_dates(
+        schedule['first_payment_date'], schedule['frequency'],
+        schedule['periods'])) if schedule['periods'] else []
+    return decoded
+
+
+def page_count(schedule, page_size):
+    """The number of pages a stored schedule fills."""
+    return max(1, -(-schedule['periods'] // page_size))
+
+
+def schedule_page(schedule, page, page_size, decoded=None):
+    """
+    Decodes one page of a store payload made by `encode_schedule` into
+    table records keyed by the amortization DataFrame column names, with
+    amounts formatted for display. Only the page's dates are computed,
+    unless the whole schedule has already been decoded by `decode_schedule`
+    and is passed as `decoded`.
+    """
+    start = min(page * page_size, schedule['periods'])
+    stop = min(start + page_size, schedule['periods'])
+    if decoded is None:
+        dates = pc.format_dates(pc.nth_payment_dates(
+            schedule['first_payment_date'], schedule['frequency'],
+            np.arange(start, stop)))
+        values = {
+            key: decode_column(value, schedule['encoding'])[start:stop] / 100
+            for key, value in schedule['columns'].items()}
+    else:
+        dates = decoded['dates'][start:stop]
+        values = {key: decoded[key][start:stop] for key in SCHEDULE_COLUMNS}
+    records = [{'Payment Date': date} for date in dates]
+    for key, column in SCHEDULE_COLUMNS.items():
+        for record, value in zip(records, format_currency(values[key])):
+            record[column] = value
+    return records
+
+
+def format_currency(values):
+    """Formats dollar amounts for display, e.g. '$1,234.56'."""
+    return ['${:,.2f}'.format(value) for value in values]
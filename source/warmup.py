@@ -0,0 +1,58 @@
+"""
+An optional warm-up run at startup, before the worker serves requests.
+
+Imports that are deferred to keep startup fast, e.g. pandas, and plotly's
+validators and templates, are loaded on first use instead, so without a
+warm-up the first user of each new instance waits for them. `warm_up`
+pays that cost up front by doing the work of adding a debt and opening the
+app once, without touching any cache or store a user's request would read.
+"""
+
+import logging
+import time
+from plotly.io.json import to_json_plotly
+import source.base as b
+from source.callbacks import visualization_callbacks as v
+from source.config import AMORTIZATION_STORE_ENCODING
+from source.utils import constants as c
+from source.utils import store_codec
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_DEBT = {
+    'name': 'Warm-up',
+    'account_type': 'personal',
+    'balance': 10_000.0,
+    'interest_rate': 5.0,
+    'interest_calculation_method': 'simple',
+    'payment_frequency': 'Monthly',
+    'next_payment_date': '2025-01-31',
+    'payment_amount': 250.0
+}
+
+
+def warm_up(app):
+    """
+    Generates and encodes a schedule, builds the payoff graph and Table View
+    from it, and serves the app's index page once, logging how long it took.
+    """
+    start = time.perf_counter()
+    amort = b.Amortization(**WARM_UP_DEBT)
+    amortizations_data = [{
+        'name': amort.debt.name,
+        'debt_index': 0,
+        'color': c.color_order[0],
+        'schedule': store_codec.encode_schedule(
+            amort.generate_amortization(), amort.debt.payment_frequency,
+            AMORTIZATION_STORE_ENCODING)
+    }]
+    schedules = v.DecodedSchedules(amortizations_data)
+    to_json_plotly({
+        'figure': v.create_payoff_figure(amortizations_data, schedules),
+        'tables': v.create_amortization_cards(amortizations_data, schedules)
+    })
+    with app.server.test_client() as client:
+        for path in ('/', '/_dash-layout', '/_dash-dependencies'):
+            client.get(path)
+    logger.info('Warmed up', extra={'fields': {
+        'seconds': round(time.perf_counter() - start, 3)}})